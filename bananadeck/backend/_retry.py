@@ -0,0 +1,165 @@
+import functools
+import logging
+import os
+import random
+import threading
+import time
+from typing import Callable, Optional
+
+from google import genai
+from google.genai import errors
+
+logger = logging.getLogger(__name__)
+
+# HTTP status codes worth retrying: rate limiting and transient server errors
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# Default process-wide request budget; override with the GEMINI_RPM env var
+DEFAULT_REQUESTS_PER_MINUTE = 60
+
+
+class RateLimiter:
+    """Thread-safe token bucket allowing `rate` calls per `period` seconds."""
+
+    def __init__(self, rate: int, period: float = 60.0):
+        self.capacity = float(rate)
+        self.fill_rate = rate / period
+        self.tokens = float(rate)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+        # Per-minute usage, logged at DEBUG so GEMINI_RPM can be tuned
+        self.window_start = self.updated
+        self.window_calls = 0
+
+    def acquire(self) -> None:
+        """Block until a token is available, then consume it."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated) * self.fill_rate
+                )
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    self._record_call(now)
+                    return
+
+                wait = (1 - self.tokens) / self.fill_rate
+            time.sleep(wait)
+
+    def _record_call(self, now: float) -> None:
+        if now - self.window_start >= 60:
+            logger.debug(f"Gemini calls in the last minute: {self.window_calls}")
+            self.window_start = now
+            self.window_calls = 0
+        self.window_calls += 1
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Return the process-wide Gemini rate limiter, creating it on first use.
+
+    Created lazily so GEMINI_RPM can come from a .env file loaded after import.
+    """
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            rpm = int(os.getenv("GEMINI_RPM", DEFAULT_REQUESTS_PER_MINUTE))
+            _limiter = RateLimiter(rpm)
+        return _limiter
+
+
+def _retry_after_seconds(error: errors.APIError) -> Optional[float]:
+    """Return the server-requested delay from a Retry-After header, if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    value = headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def retry(
+    max_attempts: int = 5, base: float = 2.0, max_delay: float = 60.0
+) -> Callable:
+    """Retry a Gemini call with exponential backoff on rate limits and server errors.
+
+    Args:
+        max_attempts: Total number of attempts before the error is re-raised.
+        base: Base of the exponential backoff, in seconds.
+        max_delay: Upper bound on the delay between attempts, in seconds.
+
+    Returns:
+        Decorator wrapping the function with retry logic.
+    """
+
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            for attempt in range(1, max_attempts + 1):
+                try:
+                    return fn(*args, **kwargs)
+                except errors.APIError as e:
+                    if e.code not in RETRYABLE_STATUS_CODES or attempt == max_attempts:
+                        raise
+
+                    delay = _retry_after_seconds(e)
+                    if delay is None:
+                        # Full jitter keeps concurrent callers from retrying in lockstep
+                        delay = random.uniform(0, min(max_delay, base**attempt))
+                    delay = min(delay, max_delay)
+
+                    logger.info(
+                        f"Gemini call failed with {e.code} (attempt {attempt}/{max_attempts}), "
+                        f"retrying in {delay:.1f}s"
+                    )
+                    time.sleep(delay)
+
+        return wrapper
+
+    return decorator
+
+
+@retry()
+def generate_content(client: genai.Client, **kwargs):
+    """Call client.models.generate_content, retrying transient Gemini errors.
+
+    Every attempt, including retries, waits on the process-wide rate limiter
+    so concurrent callers stay within the GEMINI_RPM budget.
+
+    Args:
+        client: Gemini client to use for the request.
+        **kwargs: Arguments forwarded to client.models.generate_content.
+
+    Returns:
+        The Gemini GenerateContentResponse.
+    """
+    get_rate_limiter().acquire()
+    return client.models.generate_content(**kwargs)
+
+
+def generate_content_stream(client: genai.Client, **kwargs):
+    """Call client.models.generate_content_stream under the process-wide rate limiter.
+
+    Not retried: a stream that fails part-way through cannot be resumed, so
+    callers should fall back to generate_content instead.
+
+    Args:
+        client: Gemini client to use for the request.
+        **kwargs: Arguments forwarded to client.models.generate_content_stream.
+
+    Returns:
+        Iterator of partial GenerateContentResponse chunks.
+    """
+    get_rate_limiter().acquire()
+    return client.models.generate_content_stream(**kwargs)
@@ -13,11 +13,15 @@ import sys
 from pathlib import Path
 
 # Add the project root to the path
-sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+_project_root = str(Path(__file__).resolve().parent.parent.parent)
+if _project_root not in sys.path:
+    sys.path.append(_project_root)
 
-from bananadeck.backend.main import expand_slide
+from bananadeck.backend.main import expand_slide, setup_logging
 
 if __name__ == "__main__":
+    setup_logging()
+
     if len(sys.argv) != 2:
         print("Usage: python expand_slide_example.py <slide_number>")
         print("Example: python expand_slide_example.py 3")
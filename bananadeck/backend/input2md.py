@@ -1,21 +1,176 @@
+import hashlib
+import json
 import logging
 import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from io import BytesIO
 from pathlib import Path
-from typing import Union
+from typing import Callable, List, Optional, Tuple, Union
 
 from google import genai
 from google.genai import types
 
+from ._retry import generate_content
+
+try:
+    from pypdf import PdfReader, PdfWriter
+except ImportError:  # the "pdf" extra; without it PDFs are sent in one request
+    PdfReader = PdfWriter = None
+
+# Set once the missing-pypdf fallback has been logged
+_pypdf_fallback_logged = threading.Event()
+
+# Default output directory relative to project root
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+OUTPUTS_DIR = PROJECT_ROOT / "outputs"
+
+# Records the output folder of the most recent conversion, inside OUTPUTS_DIR
+LAST_OUTPUT_FILE_NAME = ".last.json"
+
+# Captures the 11-character video ID of a YouTube URL. Only used for
+# extraction; any youtube.com/youtu.be URL is accepted as YouTube input
+YOUTUBE_URL_PATTERN = re.compile(
+    r"(?:youtube\.com/(?:watch\?(?:[^&#]*&)*v=|shorts/|embed/|live/|v/)"
+    r"|youtu\.be/)([A-Za-z0-9_-]{11})"
+)
+
+# Characters replaced with "_" and characters dropped when building file names
+_PATH_SEPARATOR_TABLE = str.maketrans({" ": "_", "/": "_", "\\": "_"})
+_UNSAFE_NAME_CHARS = re.compile(r"[^\w-]")
+
+# Index of processed YouTube videos, stored in the base output directory
+YOUTUBE_INDEX_FILENAME = ".yt_index.json"
+_youtube_index_lock = threading.Lock()
+
+# Large PDFs are split into page ranges converted concurrently
+PDF_CHUNK_PAGES = 8
+PDF_CHUNK_CONCURRENCY = 3
+
+
+def atomic_write_text(output_path: Path, text: str) -> None:
+    """Write text to a file via a temp file and os.replace so readers never see a partial file.
+
+    Args:
+        output_path: Path to write to
+        text: Text content to write
+    """
+    # Create output directory if it doesn't exist
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=output_path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def record_last_output_dir(output_dir: Path) -> None:
+    """Record output_dir as the output folder of the most recent pipeline run.
+
+    Args:
+        output_dir: Output folder used by the conversion
+    """
+    atomic_write_text(
+        OUTPUTS_DIR / LAST_OUTPUT_FILE_NAME,
+        json.dumps({"last_output_dir": str(output_dir), "ts": time.time()}),
+    )
+
+
+def read_last_output_dir() -> Optional[Path]:
+    """Return the output folder of the most recent pipeline run.
+
+    Returns:
+        Path to the folder, or None if nothing was recorded or it no longer exists
+    """
+    try:
+        with open(OUTPUTS_DIR / LAST_OUTPUT_FILE_NAME, "r", encoding="utf-8") as f:
+            last_output_dir = Path(json.load(f)["last_output_dir"])
+    except (FileNotFoundError, json.JSONDecodeError, KeyError):
+        return None
+    return last_output_dir if last_output_dir.is_dir() else None
+
+
+def _safe_name(name: str) -> str:
+    """Sanitize a title for use as a file or folder name.
+
+    Spaces and path separators become underscores; anything other than
+    letters, digits, "_" and "-" is dropped.
+
+    Args:
+        name: Title to sanitize
+
+    Returns:
+        Sanitized name, which may be empty
+    """
+    return _UNSAFE_NAME_CHARS.sub("", name.translate(_PATH_SEPARATOR_TABLE))
+
+
+def _hash_file(path: Path, chunk_size: int = 1 << 20) -> str:
+    """Compute a BLAKE2b content hash of a file, reading it in chunks.
+
+    Args:
+        path: Path to the file
+        chunk_size: Number of bytes to read per chunk
+
+    Returns:
+        Hex digest of the file content
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _split_pdf(pdf_path: Path, pages_per_chunk: int) -> List[Tuple[int, int, bytes]]:
+    """Split a PDF into chunks of at most pages_per_chunk pages.
+
+    Args:
+        pdf_path: Path to the PDF file
+        pages_per_chunk: Maximum number of pages per chunk
+
+    Returns:
+        List of (first_page, last_page, chunk_bytes) tuples with 1-based page numbers.
+        Empty if the PDF fits in a single chunk or pypdf is not installed.
+    """
+    if PdfReader is None:
+        return []
+
+    reader = PdfReader(pdf_path)
+    total_pages = len(reader.pages)
+    if total_pages <= pages_per_chunk:
+        return []
+
+    chunks = []
+    for start in range(0, total_pages, pages_per_chunk):
+        end = min(start + pages_per_chunk, total_pages)
+        writer = PdfWriter()
+        for page in reader.pages[start:end]:
+            writer.add_page(page)
+        buffer = BytesIO()
+        writer.write(buffer)
+        chunks.append((start + 1, end, buffer.getvalue()))
+    return chunks
+
 
 class BaseConverter:
     """Base class for all content converters with common functionality."""
 
-    def __init__(self, api_key: str = None, logger=None):
+    def __init__(self, api_key: str = None, logger=None, client: genai.Client = None):
         """Initialize the converter with API key.
 
         Args:
             api_key: Google Gemini API key. If None, will try to get from environment variable GEMINI_KEY.
             logger: Logger object for logging messages.
+            client: Optional Gemini client to share with other converters. If None, a new client is created.
         """
         self.api_key = api_key or os.getenv("GEMINI_KEY")
         if not self.api_key:
@@ -23,23 +178,56 @@ class BaseConverter:
                 "API key is required. Set GEMINI_KEY environment variable or pass api_key parameter."
             )
 
-        self.client = genai.Client(api_key=self.api_key)
+        self.client = client or genai.Client(api_key=self.api_key)
         self.logger = logger or logging.getLogger(__name__)
 
-    def save_markdown(self, markdown: str, output_path: Path) -> None:
-        """Save markdown content to file.
+        # Markdown is written on background threads so disk I/O overlaps the
+        # next Gemini call; flush() waits for the pending writes
+        self._io_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="md-io")
+        self._pending_writes: List[Future] = []
+
+    def save_markdown(self, markdown: str, output_path: Path) -> Future:
+        """Save markdown content to file on a background thread.
 
         Args:
             markdown: Markdown content to save
             output_path: Path to save the markdown file
+
+        Returns:
+            Future that completes once the file is written
         """
-        # Create output directory if it doesn't exist
-        output_path.parent.mkdir(parents=True, exist_ok=True)
+        return self._submit_write(markdown, output_path)
+
+    def _submit_write(self, text: str, output_path: Path) -> Future:
+        """Queue an atomic write of text to output_path on the I/O pool."""
+        return self._submit_io(self._write_text, text, output_path)
 
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(markdown)
+    def _submit_io(self, fn: Callable[..., None], *args) -> Future:
+        """Run fn(*args) on the I/O pool, tracking it so flush() waits for it."""
+        future = self._io_pool.submit(fn, *args)
+        self._pending_writes.append(future)
+        return future
+
+    def _write_text(self, text: str, output_path: Path) -> None:
+        atomic_write_text(output_path, text)
         self.logger.info(f"Markdown saved to: {output_path}")
 
+    def flush(self) -> None:
+        """Wait for all pending markdown writes, re-raising the first failure."""
+        pending, self._pending_writes = self._pending_writes, []
+        for future in pending:
+            future.result()
+
+    def close(self) -> None:
+        """Wait for pending markdown writes and shut down the I/O threads."""
+        self._io_pool.shutdown(wait=True)
+
+    def __enter__(self) -> "BaseConverter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
 
 class PDFToMarkdown(BaseConverter):
     """PDF to Markdown converter using Gemini AI."""
@@ -58,10 +246,6 @@ class PDFToMarkdown(BaseConverter):
 
         self.logger.info(f"Starting PDF conversion for: {pdf_path}")
 
-        # Read PDF file as bytes
-        with open(pdf_path, "rb") as file:
-            pdf_data = file.read()
-
         prompt = """Convert this PDF document into well-formatted markdown. 
         Preserve the structure, headings, lists, and formatting as much as possible.
         Add appropriate markdown headers, bullet points, and formatting.
@@ -73,52 +257,128 @@ class PDFToMarkdown(BaseConverter):
         For any images found in the document, describe them in this exact format: {image: describe image here}
         Include the image descriptions at the appropriate locations in the markdown where the images appear."""
 
-        self.logger.info("Sending PDF to Gemini for processing...")
-        response = self.client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=[
-                types.Part.from_bytes(
-                    data=pdf_data,
-                    mime_type="application/pdf",
-                ),
-                prompt,
-            ],
-        )
+        if PdfReader is None and not _pypdf_fallback_logged.is_set():
+            _pypdf_fallback_logged.set()
+            self.logger.warning(
+                "pypdf is not installed, so large PDFs are converted in a single request. "
+                'Install the "pdf" extra to convert them in concurrent chunks.'
+            )
+        chunks = _split_pdf(pdf_path, PDF_CHUNK_PAGES)
+        if not chunks:
+            self.logger.info("Sending PDF to Gemini for processing...")
+            markdown = self._convert_pdf_file(pdf_path, prompt)
+        else:
+            total_pages = chunks[-1][1]
+            self.logger.info(
+                f"Sending {total_pages}-page PDF to Gemini in {len(chunks)} chunks..."
+            )
+            chunk_prompts = [
+                f"{prompt}\n\nThis is pages {first}-{last} of {total_pages} of the document. "
+                "Continue the existing heading hierarchy; only add a document title if this chunk starts at page 1."
+                for first, last, _ in chunks
+            ]
+            with ThreadPoolExecutor(
+                max_workers=PDF_CHUNK_CONCURRENCY, thread_name_prefix="pdf-chunk"
+            ) as executor:
+                parts = executor.map(
+                    self._convert_pdf_file,
+                    [BytesIO(chunk_data) for _, _, chunk_data in chunks],
+                    chunk_prompts,
+                )
+                markdown = "\n\n".join(parts)
 
         self.logger.info("PDF conversion completed successfully")
+        return markdown
+
+    def _convert_pdf_file(self, pdf_file: Union[Path, BytesIO], prompt: str) -> str:
+        """Upload a PDF to the Gemini Files API and convert it to markdown.
+
+        The file is streamed to Gemini rather than inlined into the request body,
+        and the upload is deleted once the conversion finishes.
+
+        Args:
+            pdf_file: Path to the PDF file or an in-memory PDF chunk
+            prompt: Conversion prompt
+
+        Returns:
+            Converted markdown content
+        """
+        uploaded = self.client.files.upload(
+            file=pdf_file,
+            config=types.UploadFileConfig(mime_type="application/pdf"),
+        )
+        try:
+            response = generate_content(
+                self.client,
+                model="gemini-2.5-flash",
+                contents=[uploaded, prompt],
+            )
+        finally:
+            try:
+                self.client.files.delete(name=uploaded.name)
+            except Exception as e:
+                self.logger.warning(
+                    f"Failed to delete uploaded file {uploaded.name}: {e}"
+                )
         return response.text
 
     def process_pdf_and_save(
-        self, pdf_path: Path, output_dir: Path = None, output_path: Path = None
-    ) -> str:
+        self,
+        pdf_path: Path,
+        output_dir: Path = None,
+        output_path: Path = None,
+        return_path: bool = False,
+    ) -> Union[str, Path]:
         """Process a PDF file, convert to markdown, and optionally save to file.
 
         Args:
             pdf_path: Path to the PDF file
             output_dir: Output directory for markdown file. If None, uses default outputs directory.
             output_path: Optional specific path to save the markdown file. If provided, overrides output_dir.
+            return_path: If True, return only the markdown path once the file is on disk, without reading it back.
 
         Returns:
-            Converted markdown content
+            Converted markdown content, or the path of the saved markdown
+            file if return_path is True
         """
         if output_path is None:
             if output_dir is None:
-                # Use default output directory relative to project root
-                project_root = Path(__file__).parent.parent.parent
-                outputs_dir = project_root / "outputs"
                 folder_name = pdf_path.stem.replace(" ", "_")
-                output_dir = outputs_dir / folder_name
+                output_dir = OUTPUTS_DIR / folder_name
             output_path = output_dir / f"{pdf_path.stem.replace(' ', '_')}.md"
 
-        # Check if markdown file already exists
+        # Check if markdown file already exists; it may have been edited by
+        # hand, so it takes precedence over the cache
         if output_path.exists():
             self.logger.info(f"Markdown file already exists: {output_path}")
             self.logger.info("Skipping transcription process - done")
-            with open(output_path, "r", encoding="utf-8") as f:
-                return f.read()
+            if return_path:
+                return output_path
+            return output_path.read_text(encoding="utf-8")
+
+        if not pdf_path.exists():
+            raise FileNotFoundError(f"PDF file not found: {pdf_path}")
+
+        # Cache is keyed by the PDF content, so edited files are re-converted
+        # and renamed/copied files reuse the previous conversion
+        cache_key = _hash_file(pdf_path)
+        cache_path = OUTPUTS_DIR / ".cache" / f"{cache_key}.md"
+
+        if cache_path.exists():
+            self.logger.info(f"Found cached markdown for PDF content: {cache_path}")
+            self.logger.info("Skipping transcription process - done")
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(cache_path, output_path)
+            if return_path:
+                return output_path
+            return cache_path.read_text(encoding="utf-8")
 
         markdown = self.process_pdf(pdf_path)
-        self.save_markdown(markdown, output_path)
+        self._submit_write(markdown, cache_path)
+        saved = self.save_markdown(markdown, output_path)
+        if return_path:
+            saved.result()
+            return output_path
         return markdown
 
 
@@ -155,7 +415,8 @@ VIDEO_TITLE: [exact video title here]
 Then continue with the rest of the markdown document that someone could read and get the full value of the video even without watching it."""
 
         self.logger.info("Sending YouTube video to Gemini for analysis...")
-        response = self.client.models.generate_content(
+        response = generate_content(
+            self.client,
             model="gemini-2.5-flash",
             contents=types.Content(
                 parts=[
@@ -191,12 +452,8 @@ Then continue with the rest of the markdown document that someone could read and
         Returns:
             Video ID string
         """
-        if "v=" in youtube_url:
-            return youtube_url.split("v=")[1].split("&")[0]
-        elif "youtu.be/" in youtube_url:
-            return youtube_url.split("youtu.be/")[1].split("?")[0]
-        else:
-            return "youtube_video"
+        match = YOUTUBE_URL_PATTERN.search(youtube_url)
+        return match.group(1) if match else "youtube_video"
 
     def find_existing_video_folder(self, video_id: str, base_output_dir: Path) -> Path:
         """Find existing folder for video ID.
@@ -208,135 +465,170 @@ Then continue with the rest of the markdown document that someone could read and
         Returns:
             Path to existing folder if found, None otherwise
         """
+        index = self._load_video_index(base_output_dir / YOUTUBE_INDEX_FILENAME)
+        record = index.get(video_id)
+        if record and Path(record["md"]).exists():
+            return Path(record["folder"])
+
         if not base_output_dir.exists():
             return None
 
+        # Index miss: fall back to scanning for folders created before the
+        # index existed, and record any match so the next lookup is a hit
         for folder in base_output_dir.iterdir():
             if folder.is_dir() and video_id in folder.name:
+                for file in folder.iterdir():
+                    if file.suffix.lower() == ".md":
+                        self.record_video_output(video_id, base_output_dir, file)
+                        break
                 return folder
         return None
 
+    def _load_video_index(self, index_path: Path) -> dict:
+        """Load the YouTube video index, returning an empty index if missing or corrupt."""
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_video_index(self, index_path: Path, index: dict) -> None:
+        """Atomically write the YouTube video index."""
+        with _youtube_index_lock:
+            merged = self._load_video_index(index_path)
+            merged.update(index)
+            atomic_write_text(index_path, json.dumps(merged, indent=2))
+
+    def record_video_output(
+        self, video_id: str, base_output_dir: Path, markdown_path: Path
+    ) -> None:
+        """Record the markdown file produced for a video ID in the index.
+
+        Args:
+            video_id: YouTube video ID
+            base_output_dir: Base output directory holding the index
+            markdown_path: Path to the saved markdown file
+        """
+        self._save_video_index(
+            base_output_dir / YOUTUBE_INDEX_FILENAME,
+            {
+                video_id: {
+                    "folder": str(markdown_path.parent),
+                    "md": str(markdown_path),
+                    "mtime": markdown_path.stat().st_mtime,
+                }
+            },
+        )
+
     def process_youtube_and_save(
-        self, youtube_url: str, output_dir: Path = None, output_path: Path = None
-    ) -> str:
+        self,
+        youtube_url: str,
+        output_dir: Path = None,
+        output_path: Path = None,
+        video_id: str = None,
+        return_path: bool = False,
+    ) -> Union[str, Path]:
         """Process a YouTube video, convert to markdown, and optionally save to file.
 
         Args:
             youtube_url: YouTube video URL
             output_dir: Output directory for markdown file. If None, uses default outputs directory.
             output_path: Optional specific path to save the markdown file. If provided, overrides output_dir.
+            video_id: Optional video ID already extracted by the caller. If None, it is parsed from youtube_url.
+            return_path: If True, return only the markdown path once the file is on disk, without reading it back.
 
         Returns:
-            Enhanced markdown content
+            Enhanced markdown content, or the path of the saved markdown
+            file if return_path is True
         """
         # Extract video ID first
-        video_id = self.extract_video_id(youtube_url)
-
-        # If output_path is not provided, we need to determine it
-        if output_path is None:
-            if output_dir is None:
-                # Use default output directory relative to project root
-                project_root = Path(__file__).parent.parent.parent
-                base_output_dir = project_root / "outputs"
-
-                # Check if folder with this video ID already exists
-                existing_folder = self.find_existing_video_folder(
-                    video_id, base_output_dir
-                )
-                if existing_folder:
-                    # Find the markdown file in the existing folder
-                    for file in existing_folder.iterdir():
-                        if file.suffix.lower() == ".md":
-                            output_path = file
-                            break
-
-                    if output_path and output_path.exists():
-                        self.logger.info(f"Found existing markdown file: {output_path}")
-                        self.logger.info("Skipping transcription process - done")
-                        with open(output_path, "r", encoding="utf-8") as f:
-                            return f.read()
-
-                # If no existing folder found, we need to process the video to get the title
-                markdown, video_title = self.process_youtube_video(youtube_url)
-
-                # Create folder with format: <videoID_title>
-                safe_title = (
-                    video_title.replace(" ", "_").replace("/", "_").replace("\\", "_")
-                )
-                safe_title = "".join(c for c in safe_title if c.isalnum() or c in "_-")
-                if not safe_title:  # fallback if title is empty or invalid
-                    safe_title = "video"
-
-                folder_name = f"{video_id}_{safe_title}"
-                output_dir = base_output_dir / folder_name
-            else:
-                # Use provided output_dir, but first check if folder with video ID already exists
-                existing_folder = self.find_existing_video_folder(video_id, output_dir)
-                if existing_folder:
-                    # Find the markdown file in the existing folder
-                    for file in existing_folder.iterdir():
-                        if file.suffix.lower() == ".md":
-                            output_path = file
-                            break
-
-                    if output_path and output_path.exists():
-                        self.logger.info(f"Found existing markdown file: {output_path}")
-                        self.logger.info("Skipping transcription process - done")
-                        with open(output_path, "r", encoding="utf-8") as f:
-                            return f.read()
-
-                # If no existing folder found, we need to process the video to get the title
-                markdown, video_title = self.process_youtube_video(youtube_url)
-
-                # Create folder with format: <videoID_title> within the provided output_dir
-                safe_title = (
-                    video_title.replace(" ", "_").replace("/", "_").replace("\\", "_")
-                )
-                safe_title = "".join(c for c in safe_title if c.isalnum() or c in "_-")
-                if not safe_title:  # fallback if title is empty or invalid
-                    safe_title = "video"
-
-                folder_name = f"{video_id}_{safe_title}"
-                output_dir = output_dir / folder_name
-
-            # Use video title for filename
-            filename = (
-                video_title.replace(" ", "_").replace("/", "_").replace("\\", "_")
-            )
-            filename = "".join(c for c in filename if c.isalnum() or c in "_-")
-            if not filename:  # fallback if title is empty or invalid
-                filename = f"youtube_{video_id}"
-
-            output_path = output_dir / f"{filename}.md"
-
-        # Check if markdown file already exists
-        if output_path.exists():
-            self.logger.info(f"Markdown file already exists: {output_path}")
-            self.logger.info("Skipping transcription process - done")
-            with open(output_path, "r", encoding="utf-8") as f:
-                return f.read()
-
-        # If we haven't processed the video yet (when output_path was provided), do it now
-        if "markdown" not in locals():
-            markdown, video_title = self.process_youtube_video(youtube_url)
-
-        self.save_markdown(markdown, output_path)
+        if video_id is None:
+            video_id = self.extract_video_id(youtube_url)
+
+        if output_path is not None:
+            # Check if markdown file already exists
+            if output_path.exists():
+                self.logger.info(f"Markdown file already exists: {output_path}")
+                self.logger.info("Skipping transcription process - done")
+                if return_path:
+                    return output_path
+                return output_path.read_text(encoding="utf-8")
+
+            markdown, _ = self.process_youtube_video(youtube_url)
+            saved = self.save_markdown(markdown, output_path)
+            if return_path:
+                saved.result()
+                return output_path
+            return markdown
+
+        base_output_dir = output_dir or OUTPUTS_DIR
+
+        # Check if folder with this video ID already exists
+        existing_folder = self.find_existing_video_folder(video_id, base_output_dir)
+        if existing_folder:
+            # Find the markdown file in the existing folder
+            for file in existing_folder.iterdir():
+                if file.suffix.lower() == ".md":
+                    self.logger.info(f"Found existing markdown file: {file}")
+                    self.logger.info("Skipping transcription process - done")
+                    if return_path:
+                        return file
+                    return file.read_text(encoding="utf-8")
+
+        # If no existing markdown found, we need to process the video to get the title
+        markdown, video_title = self.process_youtube_video(youtube_url)
+
+        # Create folder with format: <videoID_title> and name the file after the title,
+        # with fallbacks if the title is empty or invalid
+        safe_title = _safe_name(video_title)
+        output_dir = base_output_dir / f"{video_id}_{safe_title or 'video'}"
+        output_path = output_dir / f"{safe_title or f'youtube_{video_id}'}.md"
+
+        def save_and_record() -> None:
+            # Index the video only once its markdown is on disk. Both happen in
+            # the same job, so flush() also waits for the index entry
+            self._write_text(markdown, output_path)
+            self.record_video_output(video_id, base_output_dir, output_path)
+
+        saved = self._submit_io(save_and_record)
+        if return_path:
+            saved.result()
+            return output_path
         return markdown
 
 
 class UniversalConverter:
     """Universal converter that routes to appropriate converter based on input type."""
 
-    def __init__(self, api_key: str = None, logger=None):
+    def __init__(self, api_key: str = None, logger=None, client: genai.Client = None):
         """Initialize the universal converter.
 
         Args:
             api_key: Google Gemini API key. If None, will try to get from environment variable GEMINI_KEY.
             logger: Logger object for logging messages.
+            client: Optional Gemini client to share with other pipeline stages. If None, a new client is created.
         """
         self.logger = logger or logging.getLogger(__name__)
-        self.pdf_converter = PDFToMarkdown(api_key, self.logger)
-        self.yt_converter = YouTubeToMarkdown(api_key, self.logger)
+        self.pdf_converter = PDFToMarkdown(api_key, self.logger, client=client)
+        # Share one client so both converters reuse the same connection pool
+        self.client = self.pdf_converter.client
+        self.yt_converter = YouTubeToMarkdown(api_key, self.logger, client=self.client)
+
+    def flush(self) -> None:
+        """Wait for markdown writes still pending in either converter."""
+        self.pdf_converter.flush()
+        self.yt_converter.flush()
+
+    def close(self) -> None:
+        """Shut down the I/O threads of both converters."""
+        self.pdf_converter.close()
+        self.yt_converter.close()
+
+    def __enter__(self) -> "UniversalConverter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
 
     def is_youtube_url(self, input_str: str) -> bool:
         """Check if input is a YouTube URL.
@@ -366,16 +658,20 @@ class UniversalConverter:
         input_data: Union[str, Path],
         output_dir: Path = None,
         output_path: Path = None,
-    ) -> str:
+        return_path: bool = False,
+    ) -> Union[str, Path]:
         """Convert input to markdown based on input type.
 
         Args:
             input_data: Input data (PDF file path or YouTube URL)
             output_dir: Output directory for markdown file. If None, uses default outputs directory.
             output_path: Optional specific output path for markdown file. If provided, overrides output_dir.
+            return_path: If True, return only the markdown path without reading cached markdown back.
 
         Returns:
-            Converted markdown content
+            Converted markdown content, or the path of the saved markdown
+            file if return_path is True.
+            The saved file's parent is the output folder for this input.
 
         Raises:
             ValueError: If input type is not supported
@@ -384,15 +680,17 @@ class UniversalConverter:
 
         if self.is_youtube_url(input_str):
             self.logger.info("Detected YouTube URL, using YouTube converter")
-            return self.yt_converter.process_youtube_and_save(
-                input_str, output_dir, output_path
+            result = self.yt_converter.process_youtube_and_save(
+                input_str, output_dir, output_path, return_path=return_path
             )
         elif self.is_pdf_file(input_data):
             self.logger.info("Detected PDF file, using PDF converter")
-            return self.pdf_converter.process_pdf_and_save(
-                Path(input_data), output_dir, output_path
+            result = self.pdf_converter.process_pdf_and_save(
+                Path(input_data), output_dir, output_path, return_path=return_path
             )
         else:
             raise ValueError(
                 f"Unsupported input type: {input_data}. Supported types: PDF files and YouTube URLs"
             )
+
+        return result
@@ -1,148 +1,274 @@
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
 import sys
 from pathlib import Path
+from typing import List
 
-sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+_project_root = str(Path(__file__).resolve().parent.parent.parent)
+if _project_root not in sys.path:
+    sys.path.append(_project_root)
 
 from dotenv import load_dotenv
 
-from bananadeck.backend.input2md import UniversalConverter
-from bananadeck.backend.md2skeleton import MarkdownToPresentationSkeleton
-from bananadeck.backend.skeleton2slides import PresentationSlideGenerator
-from bananadeck.backend.slides_redo import expand_slide_workflow
+# The pipeline modules pull in google.genai and PIL, which are slow to import.
+# They are imported inside process_inputs and expand_slide so that importing
+# this module (e.g. for setup_logging in server.py) stays cheap.
 
 load_dotenv()
 GEMINI_KEY = os.getenv("GEMINI_KEY")
 
-# Configure logging
-log_file_path = Path(__file__).parent / "main.log"
-if log_file_path.exists():
-    log_file_path.unlink()  # Delete existing log file
+logger = logging.getLogger(__name__)
+
+
+def setup_logging(log_file_path: Path = Path(__file__).parent / "main.log") -> None:
+    """Configure root logging once; later calls are no-ops.
+
+    Records are put on a queue and written by a background QueueListener
+    thread, so logging calls from pipeline worker threads never wait on
+    file or console I/O.
+
+    Args:
+        log_file_path: Log file to write to. It is rotated rather than deleted,
+            and only opened when the first record is written.
+    """
+    root_logger = logging.getLogger()
+    if root_logger.hasHandlers():
+        return
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler(log_file_path, encoding="utf-8"),
+    formatter = logging.Formatter(
+        "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    handlers = [
+        logging.handlers.RotatingFileHandler(
+            log_file_path,
+            maxBytes=10_000_000,
+            backupCount=3,
+            encoding="utf-8",
+            delay=True,
+        ),
         logging.StreamHandler(),
-    ],
-)
-logger = logging.getLogger(__name__)
+    ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    listener.start()
+    # Drain queued records before the interpreter exits
+    atexit.register(listener.stop)
+
+    root_logger.setLevel(logging.INFO)
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+
+
+# Maximum number of slide image requests in flight, and slides per request
+SLIDE_IMAGE_CONCURRENCY = 3
+SLIDE_IMAGE_BATCH_SIZE = 4
+
+# Maximum number of documents per presentation skeleton request
+SKELETON_BATCH_SIZE = 4
 
 
 def process_input(input_path: str) -> None:
     """Process input file or URL through the complete pipeline."""
-    converter = UniversalConverter(logger=logger, api_key=GEMINI_KEY)
+    process_inputs([input_path])
+
+
+def process_inputs(input_paths: List[str]) -> None:
+    """Process several input files or URLs through the complete pipeline.
+
+    Skeletons for inputs that need one are generated SKELETON_BATCH_SIZE
+    documents per Gemini request.
+    """
+    from google import genai
+
+    from bananadeck.backend.input2md import (
+        OUTPUTS_DIR,
+        UniversalConverter,
+        record_last_output_dir,
+    )
+    from bananadeck.backend.md2skeleton import MarkdownToPresentationSkeleton
+    from bananadeck.backend.skeleton2slides import PresentationSlideGenerator
+
+    # One client for every stage, so its HTTP connection pool is reused
+    client = genai.Client(api_key=GEMINI_KEY)
+    converter = UniversalConverter(logger=logger, api_key=GEMINI_KEY, client=client)
     presentation_generator = MarkdownToPresentationSkeleton(
-        logger=logger, api_key=GEMINI_KEY
+        logger=logger, api_key=GEMINI_KEY, client=client
+    )
+    slide_generator = PresentationSlideGenerator(
+        logger=logger, api_key=GEMINI_KEY, client=client
     )
-    slide_generator = PresentationSlideGenerator(logger=logger, api_key=GEMINI_KEY)
 
     try:
-        # Determine output directory based on input type
-        project_root = Path(__file__).parent.parent.parent
-        outputs_dir = project_root / "outputs"
-
-        if input_path.endswith(".pdf"):
-            folder_name = Path(input_path).stem.replace(" ", "_")
-            base_output_dir = outputs_dir / folder_name
+        # Step 1: Convert inputs to markdown
+        jobs = []
+        for input_path in input_paths:
+            logger.info(f"Step 1: Converting input to markdown: {input_path}")
+            try:
+                if input_path.endswith(".pdf"):
+                    # For PDF, convert directly to base output directory (not v0)
+                    folder_name = Path(input_path).stem.replace(" ", "_")
+                    markdown_path = converter.convert(
+                        input_path, OUTPUTS_DIR / folder_name, return_path=True
+                    )
+                else:
+                    # For YouTube, the converter creates the <videoID_title> folder
+                    markdown_path = converter.convert(
+                        input_path, OUTPUTS_DIR, return_path=True
+                    )
+            except Exception as e:
+                logger.error(f"Error processing input {input_path}: {e}")
+                continue
+            logger.info("Markdown conversion completed successfully")
+
+            # The transcript stays in the folder the converter used; skeleton and
+            # slides go into its v0 directory
+            base_output_dir = markdown_path.parent
             v0_output_dir = base_output_dir / "v0"
-        else:  # YouTube URL - let the converter handle folder naming
-            # For YouTube, we'll let the converter create the folder, then create v0 inside it
-            base_output_dir = outputs_dir  # Will be updated after conversion
-            v0_output_dir = None  # Will be set after we know the actual folder name
-
-        # Step 1: Convert input to markdown
-        logger.info(f"Step 1: Converting input to markdown: {input_path}")
-        if input_path.endswith(".pdf"):
-            # For PDF, convert directly to base output directory (not v0)
-            markdown_content = converter.convert(input_path, base_output_dir)
-        else:
-            # For YouTube, convert to base outputs directory
-            markdown_content = converter.convert(input_path, outputs_dir)
-            # Then find the created folder and set up v0 structure
-            if outputs_dir.exists():
-                folders = [f for f in outputs_dir.iterdir() if f.is_dir()]
-                if folders:
-                    # Get the most recently modified folder
-                    base_output_dir = max(folders, key=lambda f: f.stat().st_mtime)
-                    v0_output_dir = base_output_dir / "v0"
-                    # Create v0 directory for skeleton and slides (transcript stays in main folder)
-                    v0_output_dir.mkdir(parents=True, exist_ok=True)
-                    logger.info(f"Created v0 directory: {v0_output_dir}")
-        logger.info("Markdown conversion completed successfully")
-
-        # Step 2: Generate presentation skeleton from markdown
-        logger.info("Step 2: Generating presentation skeleton from markdown")
-
-        # Create presentation path in v0 directory
-        if input_path.endswith(".pdf"):
-            presentation_path = v0_output_dir / f"{folder_name}_presentation.md"
-        else:
-            # For YouTube videos, use the base folder name
+            v0_output_dir.mkdir(parents=True, exist_ok=True)
+
+            # Create presentation path in v0 directory
             presentation_path = (
                 v0_output_dir / f"{base_output_dir.name}_presentation.md"
             )
+            jobs.append((markdown_path, presentation_path))
+
+        # A single new skeleton is streamed so slide images can be generated
+        # while Gemini is still writing the later slides
+        batched_jobs = jobs
+        if len(jobs) == 1 and not jobs[0][1].exists():
+            markdown_path, presentation_path = jobs[0]
+            logger.info(
+                "Steps 2-3: Streaming presentation skeleton into slide image generation"
+            )
+            try:
+                _, generated_images = slide_generator.generate_slide_images_from_stream(
+                    presentation_generator.stream_and_save_presentation(
+                        markdown_path, presentation_path
+                    ),
+                    presentation_path.parent / "slides",
+                    max_concurrency=SLIDE_IMAGE_CONCURRENCY,
+                )
+                logger.info(
+                    f"Slide image generation completed successfully. Generated {len(generated_images)} images"
+                )
+                batched_jobs = []
+            except Exception as e:
+                # Slides finished before the failure are in the image cache
+                logger.warning(
+                    f"Streaming skeleton generation failed: {e}. Falling back to a regular request"
+                )
+
+        if batched_jobs:
+            # Step 2: Generate presentation skeletons from markdown
+            logger.info("Step 2: Generating presentation skeletons from markdown")
+
+            # Pass the markdown paths so transcripts are only read if their
+            # skeleton actually needs to be generated
+            presentations = presentation_generator.generate_and_save_presentations(
+                batched_jobs, batch_size=SKELETON_BATCH_SIZE
+            )
+            logger.info("Presentation skeleton generation completed successfully")
+
+            # Step 3: Generate slide images from presentation skeletons
+            logger.info("Step 3: Generating slide images from presentation skeleton")
+            for (_, presentation_path), presentation in zip(
+                batched_jobs, presentations
+            ):
+                # Create slides directory in v0
+                slides_output_dir = presentation_path.parent / "slides"
+
+                generated_images = slide_generator.generate_all_slide_images(
+                    presentation_path,
+                    slides_output_dir,
+                    max_concurrency=SLIDE_IMAGE_CONCURRENCY,
+                    batch_size=SLIDE_IMAGE_BATCH_SIZE,
+                    # Skeletons are already in memory; don't read them back from disk
+                    markdown_content=presentation,
+                )
+                logger.info(
+                    f"Slide image generation completed successfully. Generated {len(generated_images)} images"
+                )
+
+        # Make sure the transcript markdown written in the background is on disk
+        converter.flush()
+
+        # Point expand_slide at the last input only once its pipeline has finished
+        if jobs:
+            record_last_output_dir(jobs[-1][1].parent.parent)
 
-        presentation_content = presentation_generator.generate_and_save_presentation(
-            markdown_content, presentation_path
-        )
-        logger.info("Presentation skeleton generation completed successfully")
-
-        # Step 3: Generate slide images from presentation skeleton
-        logger.info("Step 3: Generating slide images from presentation skeleton")
+    except Exception as e:
+        logger.error(f"Error processing input: {e}")
+    finally:
+        converter.close()
 
-        # Create slides directory in v0
-        slides_output_dir = v0_output_dir / "slides"
 
-        generated_images = slide_generator.generate_all_slide_images(
-            presentation_path, slides_output_dir
-        )
-        logger.info(
-            f"Slide image generation completed successfully. Generated {len(generated_images)} images"
+def _list_files(directory: Path, suffix: str) -> List[Path]:
+    """List the files in directory whose names end with suffix, in one scandir pass."""
+    with os.scandir(directory) as entries:
+        return sorted(
+            Path(entry.path)
+            for entry in entries
+            if entry.name.endswith(suffix) and entry.is_file()
         )
 
-    except Exception as e:
-        logger.error(f"Error processing input: {e}")
-
 
 def expand_slide(input_path: str, slide_number: int) -> None:
     """Expand a specific slide by splitting it into 3 slides and regenerating images."""
-    try:
-        # Determine the project structure
-        project_root = Path(__file__).parent.parent.parent
-        outputs_dir = project_root / "outputs"
+    from bananadeck.backend.input2md import OUTPUTS_DIR, read_last_output_dir
+    from bananadeck.backend.slides_redo import expand_slide_workflow
 
+    try:
         # Find the most recent output folder
-        if not outputs_dir.exists():
+        if not OUTPUTS_DIR.exists():
             raise ValueError(
                 "No outputs directory found. Please run the main process first."
             )
 
-        folders = [f for f in outputs_dir.iterdir() if f.is_dir()]
-        if not folders:
-            raise ValueError(
-                "No output folders found. Please run the main process first."
+        # Use the folder recorded by the last completed pipeline run, falling
+        # back to a scan for outputs created before it was recorded
+        latest_folder = read_last_output_dir()
+        if latest_folder is None:
+            # scandir entries carry their file type, so only the mtime needs a
+            # stat call. Skip hidden folders such as the .cache markdown cache
+            with os.scandir(OUTPUTS_DIR) as entries:
+                folders = [
+                    entry
+                    for entry in entries
+                    if entry.is_dir() and not entry.name.startswith(".")
+                ]
+            if not folders:
+                raise ValueError(
+                    "No output folders found. Please run the main process first."
+                )
+
+            # Get the most recently modified folder
+            latest_folder = Path(
+                max(folders, key=lambda entry: entry.stat().st_mtime).path
             )
-
-        # Get the most recently modified folder
-        latest_folder = max(folders, key=lambda f: f.stat().st_mtime)
         logger.info(f"Using output folder: {latest_folder}")
 
         # Look for presentation files in v0 directory, transcript in main directory
         v0_dir = latest_folder / "v0"
-        if v0_dir.exists():
+        main_files = _list_files(latest_folder, ".md")
+        if v0_dir.is_dir():
             # Presentation files are in v0 directory
-            presentation_files = list(v0_dir.glob("*_presentation.md"))
+            presentation_files = _list_files(v0_dir, "_presentation.md")
         else:
             # Fallback: look in main directory (for backward compatibility)
-            presentation_files = list(latest_folder.glob("*_presentation.md"))
+            presentation_files = [
+                f for f in main_files if f.name.endswith("_presentation.md")
+            ]
 
         # Transcript files are always in the main directory (not v0)
-        transcript_files = list(latest_folder.glob("*.md"))
         # Remove presentation files from transcript files
-        transcript_files = [f for f in transcript_files if f not in presentation_files]
+        transcript_files = [f for f in main_files if f not in presentation_files]
 
         if not presentation_files:
             raise ValueError(
@@ -177,6 +303,8 @@ def expand_slide(input_path: str, slide_number: int) -> None:
 
 
 if __name__ == "__main__":
+    setup_logging()
+
     # Example 1: Process input (run this first to create the initial presentation)
     # input = r"C:\Users\sravan953\Downloads\OpenAI_Productivity-Note_Jul-2025.pdf"
     # input = "https://www.youtube.com/watch?v=GmGRDi1h6zs&pp=0gcJCcYJAYcqIYzv"
@@ -1,25 +1,219 @@
+import json
 import logging
 from pathlib import Path
-from typing import Union
+from typing import Generator, Iterator, List, Optional, Tuple, Union
 
 from google import genai
 from google.genai import types
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from ._retry import generate_content, generate_content_stream
+
+# Prompt for structured (JSON) output; the response schema defines the slide format
+SKELETON_PROMPT = """You are a professional presentation designer. Please analyze the provided markdown content and create a comprehensive presentation skeleton that effectively communicates the key information.
+
+Start with a title slide, continue with one slide per section, and finish with a conclusion slide listing the key takeaways and next steps.
+For visual_suggestion, describe specific visual elements like charts, graphs, images, diagrams, or infographics, or leave it empty if the slide needs no visual.
+
+Guidelines:
+1. Create 8-15 slides maximum for optimal presentation length
+2. Each slide should have a clear, descriptive title
+3. Use short bullet points for easy reading
+4. Include visual suggestions where appropriate
+5. Maintain logical flow and narrative structure
+6. Focus on the most important and actionable information
+7. Make it engaging and audience-appropriate
+8. Include a strong opening and memorable conclusion
+
+Transform the markdown content into a compelling presentation that someone could use to present the material effectively."""
+
+# Used to pack several documents into one skeleton request
+BATCH_PROMPT = """You will receive {count} separate markdown documents. Each document starts with a line of the form ---DOC N---.
+Create a separate presentation skeleton for every document, following the instructions below for each one.
+Return a list with exactly one presentation per document, in document order, and set doc_number to the document's N.
+
+"""
+
+
+class SlideOutline(BaseModel):
+    title: str
+    bullet_points: List[str]
+    visual_suggestion: Optional[str] = None
+
+
+class PresentationOutline(BaseModel):
+    title: str
+    slides: List[SlideOutline]
+
+
+class _DocumentOutline(PresentationOutline):
+    """A presentation in a batched response, tagged with its ---DOC N--- number."""
+
+    doc_number: int
+
+
+_DOCUMENT_OUTLINE_LIST = TypeAdapter(List[_DocumentOutline])
+
+
+def _single_line(text: str) -> str:
+    """Collapse whitespace so model text cannot break the markdown layout."""
+    return " ".join(text.split())
+
+
+def _render_title(title: str) -> str:
+    """Render the presentation title line of the skeleton markdown."""
+    return f"# {_single_line(title)}\n\n"
+
+
+def _render_slide(slide_number: int, slide: SlideOutline) -> str:
+    """Render one slide of the skeleton markdown, followed by a blank line."""
+    lines = [f"## Slide {slide_number}: {_single_line(slide.title)}"]
+    lines.extend(f"- {_single_line(point)}" for point in slide.bullet_points)
+    if slide.visual_suggestion and slide.visual_suggestion.strip():
+        lines.append(
+            f"- **Visual suggestion:** {_single_line(slide.visual_suggestion)}"
+        )
+    return "\n".join(lines) + "\n\n"
+
+
+def render_presentation_markdown(outline: PresentationOutline) -> str:
+    """Render a structured presentation as skeleton markdown.
+
+    Args:
+        outline: Presentation returned by Gemini's structured output
+
+    Returns:
+        Presentation skeleton in the markdown format parsed by PresentationSlideGenerator
+    """
+    return _render_title(outline.title) + "".join(
+        _render_slide(slide_number, slide)
+        for slide_number, slide in enumerate(outline.slides, 1)
+    )
+
+
+class _OutlineStreamDecoder:
+    """Decode a streamed PresentationOutline JSON response one slide at a time.
+
+    Only complete values are decoded: a slide object is returned once its
+    closing brace has arrived. The full response is still validated against
+    PresentationOutline once the stream ends.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.pos = 0
+        self.started = False
+        self.in_slides = False
+        self.decoder = json.JSONDecoder()
+
+    def _skip(self, characters: str) -> None:
+        while self.pos < len(self.buffer) and self.buffer[self.pos] in characters:
+            self.pos += 1
+
+    def _decode(self):
+        """Decode the value at pos, or raise ValueError if it is incomplete."""
+        value, self.pos = self.decoder.raw_decode(self.buffer, self.pos)
+        return value
+
+    def feed(self, text: str) -> List[Tuple[str, object]]:
+        """Add streamed text and return the newly completed values.
+
+        Returns:
+            ("title", title) and ("slide", SlideOutline) pairs, in response order
+        """
+        self.buffer += text
+        values = []
+        while True:
+            start = self.pos
+            try:
+                self._skip(" \t\r\n")
+                if not self.started:
+                    if self.buffer[self.pos : self.pos + 1] != "{":
+                        break
+                    self.started = True
+                    self.pos += 1
+                    continue
+
+                self._skip(" \t\r\n,")
+                if self.in_slides:
+                    if self.buffer[self.pos : self.pos + 1] == "]":
+                        self.in_slides = False
+                        self.pos += 1
+                        continue
+                    slide = SlideOutline.model_validate(self._decode())
+                    values.append(("slide", slide))
+                    continue
+
+                # A top-level key, ":" and (for slides) the opening "["
+                key = self._decode()
+                self._skip(" \t\r\n")
+                if self.buffer[self.pos : self.pos + 1] != ":":
+                    raise ValueError("incomplete key")
+                self.pos += 1
+                self._skip(" \t\r\n")
+                if key == "slides":
+                    if self.buffer[self.pos : self.pos + 1] != "[":
+                        raise ValueError("incomplete slides")
+                    self.pos += 1
+                    self.in_slides = True
+                    continue
+                value = self._decode()
+                if key == "title":
+                    values.append(("title", value))
+            except (ValueError, ValidationError, IndexError):
+                # Incomplete or unexpected; wait for more text. Malformed
+                # responses are reported by the final validation
+                self.pos = start
+                break
+        return values
 
 
 class MarkdownToPresentationSkeleton:
     """Converts markdown content to presentation skeleton using Gemini AI."""
 
-    def __init__(self, api_key: str = None, logger=None):
+    def __init__(self, api_key: str = None, logger=None, client: genai.Client = None):
         """Initialize the presentation generator.
 
         Args:
             api_key: Google Gemini API key. If None, will try to get from environment variable GEMINI_KEY.
             logger: Logger object for logging messages.
+            client: Optional Gemini client to share with other pipeline stages. If None, a new client is created.
         """
         self.api_key = api_key
-        self.client = genai.Client(api_key=self.api_key)
+        self.client = client or genai.Client(api_key=self.api_key)
         self.logger = logger or logging.getLogger(__name__)
 
+    def generate_presentation_outline(
+        self, markdown_content: str
+    ) -> PresentationOutline:
+        """Generate a structured presentation from markdown content using Gemini AI.
+
+        Args:
+            markdown_content: The markdown content to convert to presentation
+
+        Returns:
+            Presentation title and slides, validated against PresentationOutline
+        """
+        self.logger.info("Generating presentation skeleton from markdown content...")
+
+        self.logger.info("Sending markdown to Gemini for presentation generation...")
+        response = generate_content(
+            self.client,
+            model="gemini-2.0-flash-exp",
+            contents=[
+                types.Part(text=SKELETON_PROMPT),
+                types.Part(text=markdown_content),
+            ],
+            config=types.GenerateContentConfig(
+                response_mime_type="application/json",
+                response_schema=PresentationOutline,
+            ),
+        )
+        outline = PresentationOutline.model_validate_json(response.text)
+
+        self.logger.info("Presentation skeleton generation completed successfully")
+        return outline
+
     def generate_presentation_skeleton(self, markdown_content: str) -> str:
         """Generate a presentation skeleton from markdown content using Gemini AI.
 
@@ -29,72 +223,160 @@ class MarkdownToPresentationSkeleton:
         Returns:
             Presentation skeleton in markdown format
         """
-        self.logger.info("Generating presentation skeleton from markdown content...")
+        return render_presentation_markdown(
+            self.generate_presentation_outline(markdown_content)
+        )
 
-        prompt = """You are a professional presentation designer. Please analyze the provided markdown content and create a comprehensive presentation skeleton that effectively communicates the key information.
+    def stream_presentation_skeleton(
+        self, markdown_content: str
+    ) -> Generator[str, None, PresentationOutline]:
+        """Stream a presentation skeleton from Gemini as it is generated.
 
-Create a presentation structure with the following format:
+        Requests the same structured output as generate_presentation_outline
+        and renders each slide to skeleton markdown as soon as its JSON object
+        is complete, so slides can be used before the response has finished.
 
-# [Presentation Title]
+        Args:
+            markdown_content: The markdown content to convert to presentation
 
-## Slide 1: [Title]
-- [Key point 1]
-- [Key point 2]
-- [Key point 3]
+        Yields:
+            Chunks of the presentation skeleton markdown, in order
 
-## Slide 2: [Section Title]
-- [Main point with brief explanation]
-- [Supporting detail]
-- **Visual suggestion:** [describe what visual would help - be specific about charts, images, diagrams, etc.]
+        Returns:
+            The complete presentation, validated against PresentationOutline
+        """
+        self.logger.info("Streaming presentation skeleton from Gemini...")
+        decoder = _OutlineStreamDecoder()
+        slide_number = 0
+        for chunk in generate_content_stream(
+            self.client,
+            model="gemini-2.0-flash-exp",
+            contents=[
+                types.Part(text=SKELETON_PROMPT),
+                types.Part(text=markdown_content),
+            ],
+            config=types.GenerateContentConfig(
+                response_mime_type="application/json",
+                response_schema=PresentationOutline,
+            ),
+        ):
+            if not chunk.text:
+                continue
+            for kind, value in decoder.feed(chunk.text):
+                if kind == "title":
+                    yield _render_title(value)
+                else:
+                    slide_number += 1
+                    yield _render_slide(slide_number, value)
 
-## Slide 3: [Next Section]
-- [Content point]
-- [Another point]
-- [Call to action or summary]
+        outline = PresentationOutline.model_validate_json(decoder.buffer)
+        self.logger.info("Presentation skeleton streaming completed successfully")
+        return outline
 
-[Continue with additional slides as needed...]
+    def generate_presentation_outlines_batched(
+        self, markdown_contents: List[str]
+    ) -> List[PresentationOutline]:
+        """Generate structured presentations for several documents in one Gemini call.
 
-## Final Slide: [Conclusion/Summary]
-- [Key takeaway 1]
-- [Key takeaway 2]
-- [Next steps or call to action]
+        Documents without a valid presentation in the response, e.g. because it
+        was cut short, are requested again with one call per document.
 
-IMPORTANT FORMATTING RULES:
-- For visual suggestions, ALWAYS use the exact format: "- **Visual suggestion:** [description]"
-- Do NOT use formats like "- Visual:" or "- Visual suggestion:" 
-- The visual suggestion should describe specific visual elements like charts, graphs, images, diagrams, or infographics
-- Be descriptive about what type of visual would best support the content
+        Args:
+            markdown_contents: Markdown documents to convert to presentations
 
-Guidelines:
-1. Create 8-15 slides maximum for optimal presentation length
-2. Each slide should have a clear, descriptive title
-3. Use bullet points for easy reading
-4. Include visual suggestions where appropriate using the exact format specified above
-5. Maintain logical flow and narrative structure
-6. Focus on the most important and actionable information
-7. Make it engaging and audience-appropriate
-8. Include a strong opening and memorable conclusion
+        Returns:
+            Presentations, in the same order as markdown_contents
+        """
+        if len(markdown_contents) == 1:
+            return [self.generate_presentation_outline(markdown_contents[0])]
 
-Transform the markdown content into a compelling presentation that someone could use to present the material effectively."""
+        self.logger.info(
+            f"Sending {len(markdown_contents)} markdown documents to Gemini in one presentation request..."
+        )
+        parts = [
+            types.Part(
+                text=BATCH_PROMPT.format(count=len(markdown_contents)) + SKELETON_PROMPT
+            )
+        ]
+        for doc_number, markdown_content in enumerate(markdown_contents, 1):
+            parts.append(types.Part(text=f"---DOC {doc_number}---\n{markdown_content}"))
 
-        self.logger.info("Sending markdown to Gemini for presentation generation...")
-        response = self.client.models.generate_content(
+        response = generate_content(
+            self.client,
             model="gemini-2.0-flash-exp",
-            contents=[
-                types.Part(text=prompt),
-                types.Part(text=markdown_content),
-            ],
+            contents=parts,
+            config=types.GenerateContentConfig(
+                response_mime_type="application/json",
+                response_schema=List[_DocumentOutline],
+            ),
         )
 
-        self.logger.info("Presentation skeleton generation completed successfully")
-        return response.text
+        try:
+            documents = _DOCUMENT_OUTLINE_LIST.validate_json(response.text)
+        except ValidationError as e:
+            self.logger.warning(f"Invalid batched presentation response: {e}")
+            documents = []
 
-    def save_presentation(self, presentation: str, output_path: Path) -> None:
+        # Keep the first presentation returned for each document
+        outlines = {}
+        for document in documents:
+            if 1 <= document.doc_number <= len(markdown_contents):
+                outlines.setdefault(
+                    document.doc_number,
+                    PresentationOutline(title=document.title, slides=document.slides),
+                )
+
+        missing = [
+            doc_number
+            for doc_number in range(1, len(markdown_contents) + 1)
+            if doc_number not in outlines
+        ]
+        if missing:
+            self.logger.warning(
+                f"No presentation for documents {', '.join(map(str, missing))} in the batched response. "
+                "Requesting them one at a time"
+            )
+            for doc_number in missing:
+                outlines[doc_number] = self.generate_presentation_outline(
+                    markdown_contents[doc_number - 1]
+                )
+        else:
+            self.logger.info(
+                "Batched presentation skeleton generation completed successfully"
+            )
+        return [outlines[doc_number] for doc_number in sorted(outlines)]
+
+    def generate_presentation_skeletons_batched(
+        self, markdown_contents: List[str]
+    ) -> List[str]:
+        """Generate presentation skeletons for several documents in one Gemini call.
+
+        Args:
+            markdown_contents: Markdown documents to convert to presentations
+
+        Returns:
+            Presentation skeletons in markdown format, in the same order as markdown_contents
+        """
+        return [
+            render_presentation_markdown(outline)
+            for outline in self.generate_presentation_outlines_batched(
+                markdown_contents
+            )
+        ]
+
+    def save_presentation(
+        self,
+        presentation: str,
+        output_path: Path,
+        outline: Optional[PresentationOutline] = None,
+    ) -> None:
         """Save presentation skeleton to file.
 
         Args:
             presentation: Presentation skeleton content to save
             output_path: Path to save the presentation file
+            outline: Structured presentation the skeleton was rendered from. If given,
+                it is saved next to output_path with a .json suffix.
         """
         # Create output directory if it doesn't exist
         output_path.parent.mkdir(parents=True, exist_ok=True)
@@ -103,13 +385,19 @@ Transform the markdown content into a compelling presentation that someone could
             f.write(presentation)
         self.logger.info(f"Presentation skeleton saved to: {output_path}")
 
+        if outline is not None:
+            output_path.with_suffix(".json").write_text(
+                outline.model_dump_json(indent=2), encoding="utf-8"
+            )
+
     def generate_and_save_presentation(
-        self, markdown_content: str, output_path: Path
+        self, markdown_content: Union[str, Path], output_path: Path
     ) -> str:
         """Generate presentation skeleton and save to file.
 
         Args:
-            markdown_content: The markdown content to convert to presentation
+            markdown_content: The markdown content to convert to presentation, or the path
+                of a markdown file. A path is only read if the skeleton has to be generated.
             output_path: Path to save the presentation file
 
         Returns:
@@ -122,6 +410,80 @@ Transform the markdown content into a compelling presentation that someone could
             with open(output_path, "r", encoding="utf-8") as f:
                 return f.read()
 
-        presentation = self.generate_presentation_skeleton(markdown_content)
-        self.save_presentation(presentation, output_path)
+        if isinstance(markdown_content, Path):
+            markdown_content = markdown_content.read_text(encoding="utf-8")
+
+        outline = self.generate_presentation_outline(markdown_content)
+        presentation = render_presentation_markdown(outline)
+        self.save_presentation(presentation, output_path, outline)
         return presentation
+
+    def stream_and_save_presentation(
+        self, markdown_content: Union[str, Path], output_path: Path
+    ) -> Iterator[str]:
+        """Stream a presentation skeleton and save it once the stream is complete.
+
+        The files are only written after the last chunk, so an interrupted
+        stream never leaves a partial skeleton behind. Like
+        generate_and_save_presentation, the outline is saved next to the
+        skeleton with a .json suffix.
+
+        Args:
+            markdown_content: The markdown content to convert to presentation, or the path
+                of a markdown file
+            output_path: Path to save the presentation file
+
+        Yields:
+            Chunks of the presentation skeleton markdown, in order
+        """
+        if isinstance(markdown_content, Path):
+            markdown_content = markdown_content.read_text(encoding="utf-8")
+
+        outline = yield from self.stream_presentation_skeleton(markdown_content)
+        self.save_presentation(
+            render_presentation_markdown(outline), output_path, outline
+        )
+
+    def generate_and_save_presentations(
+        self,
+        jobs: List[Tuple[Union[str, Path], Path]],
+        batch_size: int = 4,
+    ) -> List[str]:
+        """Generate and save presentation skeletons for several documents.
+
+        Documents whose presentation file already exists are skipped; the rest
+        are sent to Gemini batch_size documents per request.
+
+        Args:
+            jobs: (markdown content or markdown path, presentation output path) pairs
+            batch_size: Maximum number of documents per Gemini request
+
+        Returns:
+            Presentation skeleton contents, in the same order as jobs
+        """
+        presentations = [None] * len(jobs)
+        pending = []
+        for i, (markdown_content, output_path) in enumerate(jobs):
+            if output_path.exists():
+                self.logger.info(f"Presentation file already exists: {output_path}")
+                presentations[i] = output_path.read_text(encoding="utf-8")
+            else:
+                pending.append(i)
+
+        batch_size = max(1, batch_size)
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start : start + batch_size]
+            markdown_contents = []
+            for i in batch:
+                markdown_content = jobs[i][0]
+                if isinstance(markdown_content, Path):
+                    markdown_content = markdown_content.read_text(encoding="utf-8")
+                markdown_contents.append(markdown_content)
+
+            outlines = self.generate_presentation_outlines_batched(markdown_contents)
+            for i, outline in zip(batch, outlines):
+                presentation = render_presentation_markdown(outline)
+                self.save_presentation(presentation, jobs[i][1], outline)
+                presentations[i] = presentation
+
+        return presentations
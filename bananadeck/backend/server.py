@@ -1,32 +1,24 @@
+import asyncio
 import logging
 import os
 import sys
 from pathlib import Path
 from typing import Any, Dict
 
-sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+_project_root = str(Path(__file__).resolve().parent.parent.parent)
+if _project_root not in sys.path:
+    sys.path.append(_project_root)
 
 from dotenv import load_dotenv
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 
-from bananadeck.backend.main import process_input
+from bananadeck.backend.main import process_input, setup_logging
 
 load_dotenv()
 
 # Configure logging
-log_file_path = Path(__file__).parent / "server.log"
-if log_file_path.exists():
-    log_file_path.unlink()  # Delete existing log file
-
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler(log_file_path),
-        logging.StreamHandler(),
-    ],
-)
+setup_logging(Path(__file__).parent / "server.log")
 logger = logging.getLogger(__name__)
 
 app = FastAPI(
@@ -55,7 +47,9 @@ async def process_input_endpoint(request: ProcessRequest) -> ProcessResponse:
     """
     try:
         logger.info(f"Processing request for input: {request.input_path}")
-        process_input(request.input_path)
+        # The pipeline makes blocking Gemini calls; run it off the event loop so
+        # concurrent requests and health checks are not stalled
+        await asyncio.to_thread(process_input, request.input_path)
 
         return ProcessResponse(
             success=True,
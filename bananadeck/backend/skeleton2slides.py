@@ -1,59 +1,152 @@
+import functools
+import hashlib
 import logging
 import re
-from io import BytesIO
+import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from google import genai
 from google.genai import types
-from PIL import Image
+
+from ._retry import generate_content
+from . import input2md
+
+IMAGE_MODEL = "gemini-2.5-flash-image-preview"
+
+# Design rules shared by every slide, sent as the system instruction so
+# per-slide prompts only carry the slide's own content
+SLIDE_STYLE_INSTRUCTION = """Create a professional presentation slide with high-fidelity text rendering. The slide should be a clean, modern corporate presentation slide with a 16:9 aspect ratio.
+
+Visual implementation guidelines, for slides that list visual elements:
+- Convert ALL visual descriptions into actual visual elements (charts, graphs, images, diagrams, etc.)
+- Do NOT include any text that says 'Visual:' or 'visual:' on the slide
+- If the description mentions charts, graphs, or data visualization, create clean, professional versions
+- If it mentions images or photos, create appropriate illustrations or graphics
+- If it mentions diagrams, create clear, well-structured diagrams
+- If it mentions infographics, create visually appealing information graphics
+- If it mentions timelines, create clear chronological visualizations
+- If it mentions logos or organizations, create stylized representations
+- If it mentions quotes, create attractive quote callouts or text boxes
+- If it mentions people or faces, create professional illustrations or silhouettes
+- If it mentions split-screens or comparisons, create visual layouts that show the comparison
+- Make sure visual elements complement and enhance the text content
+- Ensure visual elements are properly integrated into the slide layout
+- Replace any text descriptions with actual visual representations
+
+Design specifications:
+- Use a professional color scheme with high contrast for readability
+- Ensure all text is clearly legible and properly positioned
+- Include appropriate visual elements that support the content
+- Use clean typography with good spacing between elements
+- Maintain a professional, corporate presentation aesthetic
+- Avoid cluttered layouts - keep it clean and focused
+- Ensure the slide title is prominently displayed at the top
+- Position bullet points clearly and logically
+- Use appropriate visual hierarchy with different text sizes
+- Include subtle background elements or graphics that enhance the message
+
+Text rendering requirements:
+- All text must be perfectly legible and accurately rendered
+- Use professional fonts suitable for presentations
+- Ensure proper contrast between text and background
+- Maintain consistent text alignment and spacing
+- Make sure the slide title stands out from the bullet points
+- NEVER render 'Visual:' or 'visual:' as text on the slide"""
+
+# Slide headers (## Slide X:) and the content up to the next header
+SLIDE_PATTERN = re.compile(r"## (Slide \d+): (.+?)(?=## |$)", re.DOTALL)
+# Slide header at the start of a section produced by splitting on "## "
+SLIDE_HEADER_PATTERN = re.compile(r"Slide \d+: ")
+# Label the model writes before each image of a batched request, so images
+# are matched to slides by number rather than by position
+BATCH_IMAGE_LABEL = "SLIDE IMAGE {position}"
+BATCH_IMAGE_LABEL_PATTERN = re.compile(r"SLIDE IMAGE (\d+)")
+# Lines starting with "-": either a visual suggestion or a regular bullet point
+BULLET_PATTERN = re.compile(
+    r"^[^\S\n]*-(?: \*\*Visual suggestion:\*\*(.*)|(.*))$", re.MULTILINE
+)
+
+
+def _split_slides(markdown_content: str) -> List[str]:
+    """Return the content of each "## Slide X:" section, up to the next "## ".
+
+    Equivalent to SLIDE_PATTERN.finditer, but splitting on "## " in C avoids
+    the regex engine testing the lookahead at every character.
+    """
+    contents = []
+    for section in markdown_content.split("## ")[1:]:
+        header = SLIDE_HEADER_PATTERN.match(section)
+        if header is None:
+            continue
+        if header.end() == len(section):
+            # An empty slide makes the regex run on into the next section;
+            # leave that corner case to the regex itself
+            return [
+                match.group(2) for match in SLIDE_PATTERN.finditer(markdown_content)
+            ]
+        contents.append(section[header.end() :])
+    return contents
+
+
+def _parse_slide(slide_number: int, content: str) -> Dict:
+    """Parse the content of one "## Slide X:" section into a slide dict."""
+    # Extract slide title
+    title = content.partition("\n")[0].strip()
+
+    # Extract bullet points and the visual suggestion in a single pass
+    bullet_points = []
+    visual_suggestion = None
+
+    for line in BULLET_PATTERN.finditer(content):
+        if line.group(1) is not None:
+            visual_suggestion = line.group(1).strip()
+        else:
+            bullet_points.append(line.group(2).strip())
+
+    return {
+        "slide_number": slide_number,
+        "title": title,
+        "bullet_points": bullet_points,
+        "visual_suggestion": visual_suggestion,
+    }
+
+
+@functools.lru_cache(maxsize=8)
+def _parse_presentation_skeleton(markdown_content: str) -> Tuple[Dict, ...]:
+    """Parse skeleton markdown into slide dicts, caching recent results."""
+    return tuple(
+        _parse_slide(i, content)
+        for i, content in enumerate(_split_slides(markdown_content), 1)
+    )
 
 
 class PresentationSlideGenerator:
-    def __init__(self, logger: logging.Logger, api_key: str):
+    def __init__(
+        self,
+        logger: logging.Logger,
+        api_key: str,
+        cache_dir: Optional[Path] = None,
+        client: Optional[genai.Client] = None,
+    ):
         self.logger = logger
         self.api_key = api_key
-        self.client = genai.Client(api_key=api_key)
+        self.client = client or genai.Client(api_key=api_key)
+        # Generated images keyed by a hash of their prompt, so unchanged slides
+        # are copied instead of regenerated. OUTPUTS_DIR is looked up here
+        # rather than imported, so overriding it moves the cache
+        self.cache_dir = cache_dir or input2md.OUTPUTS_DIR / ".cache" / "slide_images"
 
     def parse_presentation_skeleton(
         self, markdown_content: str
     ) -> List[Dict[str, str]]:
         """Parse the presentation skeleton markdown into individual slides."""
-        slides = []
-
-        # Split by slide headers (## Slide X:)
-        slide_pattern = r"## (Slide \d+): (.+?)(?=## |$)"
-        matches = re.findall(slide_pattern, markdown_content, re.DOTALL)
-
-        for i, (slide_number, content) in enumerate(matches, 1):
-            # Extract slide title
-            title = content.split("\n")[0].strip()
-
-            # Extract bullet points (lines starting with -)
-            bullet_points = []
-            visual_suggestion = None
-
-            for line in content.split("\n"):
-                line = line.strip()
-                if line.startswith("-") and not line.startswith(
-                    "- **Visual suggestion:**"
-                ):
-                    bullet_points.append(line[1:].strip())
-                elif line.startswith("- **Visual suggestion:**"):
-                    visual_suggestion = line.replace(
-                        "- **Visual suggestion:**", ""
-                    ).strip()
-
-            slides.append(
-                {
-                    "slide_number": i,
-                    "title": title,
-                    "bullet_points": bullet_points,
-                    "visual_suggestion": visual_suggestion,
-                }
-            )
-
-        return slides
+        # Copy the cached slides so callers can modify them freely
+        return [
+            dict(slide, bullet_points=list(slide["bullet_points"]))
+            for slide in _parse_presentation_skeleton(markdown_content)
+        ]
 
     def generate_image_prompt(
         self, slide: Dict[str, str], original_slide_image_path: Optional[Path] = None
@@ -80,17 +173,16 @@ class PresentationSlideGenerator:
             else:
                 filtered_bullet_points.append(point)
 
-        # Create a narrative, descriptive prompt following Nano Banana best practices
+        # Create a narrative, descriptive prompt following Nano Banana best practices.
+        # The fixed design rules are sent once as SLIDE_STYLE_INSTRUCTION
         prompt_parts = [
-            "Create a professional presentation slide with high-fidelity text rendering. The slide should be a clean, modern corporate presentation slide with a 16:9 aspect ratio.",
-            "",
             f"The slide title is: '{title}'",
             "",
             "The slide contains the following bullet points:",
         ]
-
-        for i, point in enumerate(filtered_bullet_points, 1):
-            prompt_parts.append(f"{i}. {point}")
+        prompt_parts.extend(
+            f"{i}. {point}" for i, point in enumerate(filtered_bullet_points, 1)
+        )
 
         # Handle visual suggestions and descriptions
         all_visual_elements = []
@@ -106,74 +198,72 @@ class PresentationSlideGenerator:
                     "CRITICAL: Do NOT render the following as text. Instead, create the actual visual elements described:",
                 ]
             )
+            prompt_parts.extend(
+                f"Visual element {i}: {visual}"
+                for i, visual in enumerate(all_visual_elements, 1)
+            )
 
-            for i, visual in enumerate(all_visual_elements, 1):
-                prompt_parts.append(f"Visual element {i}: {visual}")
-
+        # Add theming instructions if original slide image is provided
+        if original_slide_image_path and original_slide_image_path.exists():
             prompt_parts.extend(
                 [
                     "",
-                    "Visual implementation guidelines:",
-                    "- Convert ALL visual descriptions into actual visual elements (charts, graphs, images, diagrams, etc.)",
-                    "- Do NOT include any text that says 'Visual:' or 'visual:' on the slide",
-                    "- If the description mentions charts, graphs, or data visualization, create clean, professional versions",
-                    "- If it mentions images or photos, create appropriate illustrations or graphics",
-                    "- If it mentions diagrams, create clear, well-structured diagrams",
-                    "- If it mentions infographics, create visually appealing information graphics",
-                    "- If it mentions timelines, create clear chronological visualizations",
-                    "- If it mentions logos or organizations, create stylized representations",
-                    "- If it mentions quotes, create attractive quote callouts or text boxes",
-                    "- If it mentions people or faces, create professional illustrations or silhouettes",
-                    "- If it mentions split-screens or comparisons, create visual layouts that show the comparison",
-                    "- Make sure visual elements complement and enhance the text content",
-                    "- Ensure visual elements are properly integrated into the slide layout",
-                    "- Replace any text descriptions with actual visual representations",
+                    "THEMING REQUIREMENTS (CRITICAL):",
+                    f"- Match the exact theming, color scheme, and visual style of the original slide image: {original_slide_image_path.name}",
+                    "- Use the same color palette, fonts, and design elements as the original slide",
+                    "- Maintain visual consistency with the original slide's layout and styling",
+                    "- Ensure the new slide looks like it belongs to the same presentation series",
+                    "- Pay special attention to background colors, text colors, and visual element styling",
+                    "- The slide should be visually indistinguishable from the original in terms of design theme",
                 ]
             )
 
-        # Add theming instructions if original slide image is provided
-        theming_instructions = []
-        if original_slide_image_path and original_slide_image_path.exists():
-            theming_instructions = [
-                "",
-                "THEMING REQUIREMENTS (CRITICAL):",
-                f"- Match the exact theming, color scheme, and visual style of the original slide image: {original_slide_image_path.name}",
-                "- Use the same color palette, fonts, and design elements as the original slide",
-                "- Maintain visual consistency with the original slide's layout and styling",
-                "- Ensure the new slide looks like it belongs to the same presentation series",
-                "- Pay special attention to background colors, text colors, and visual element styling",
-                "- The slide should be visually indistinguishable from the original in terms of design theme",
-            ]
+        return "\n".join(prompt_parts)
 
-        prompt_parts.extend(
-            [
-                "",
-                "Design specifications:",
-                "- Use a professional color scheme with high contrast for readability",
-                "- Ensure all text is clearly legible and properly positioned",
-                "- Include appropriate visual elements that support the content",
-                "- Use clean typography with good spacing between elements",
-                "- Maintain a professional, corporate presentation aesthetic",
-                "- Avoid cluttered layouts - keep it clean and focused",
-                "- Ensure the slide title is prominently displayed at the top",
-                "- Position bullet points clearly and logically",
-                "- Use appropriate visual hierarchy with different text sizes",
-                "- Include subtle background elements or graphics that enhance the message",
-            ]
-            + theming_instructions
-            + [
-                "",
-                "Text rendering requirements:",
-                "- All text must be perfectly legible and accurately rendered",
-                "- Use professional fonts suitable for presentations",
-                "- Ensure proper contrast between text and background",
-                "- Maintain consistent text alignment and spacing",
-                "- Make sure the slide title stands out from the bullet points",
-                "- NEVER render 'Visual:' or 'visual:' as text on the slide",
-            ]
-        )
+    @staticmethod
+    def _save_image_part(part: types.Part, image_path: Path) -> None:
+        """Save an inline image part from a Gemini response.
 
-        return "\n".join(prompt_parts)
+        PNG data is written as-is; other formats are re-encoded to PNG with PIL.
+        """
+        if part.inline_data.mime_type == "image/png":
+            with open(image_path, "wb") as f:
+                f.write(part.inline_data.data)
+        else:
+            # PIL is slow to import and only needed for non-PNG responses
+            from io import BytesIO
+
+            from PIL import Image
+
+            Image.open(BytesIO(part.inline_data.data)).save(image_path, format="PNG")
+
+    def _image_cache_path(
+        self, prompt: str, original_slide_image_path: Optional[Path] = None
+    ) -> Path:
+        """Return the cache path for the image generated from prompt."""
+        key = hashlib.blake2b(digest_size=16)
+        key.update(IMAGE_MODEL.encode("utf-8"))
+        key.update(SLIDE_STYLE_INSTRUCTION.encode("utf-8"))
+        key.update(prompt.encode("utf-8"))
+        if original_slide_image_path and original_slide_image_path.exists():
+            key.update(original_slide_image_path.read_bytes())
+        return self.cache_dir / f"{key.hexdigest()}.png"
+
+    def _load_cached_image(self, cache_path: Path, image_path: Path) -> bool:
+        """Copy a cached slide image to image_path if there is one."""
+        if not cache_path.exists():
+            return False
+        shutil.copyfile(cache_path, image_path)
+        self.logger.info(f"Using cached image for {image_path.name}: {cache_path}")
+        return True
+
+    def _store_cached_image(self, image_path: Path, cache_path: Path) -> None:
+        """Copy a freshly generated slide image into the cache."""
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(image_path, cache_path)
+        except OSError as e:
+            self.logger.warning(f"Failed to cache image {image_path}: {e}")
 
     def generate_slide_image(
         self,
@@ -184,6 +274,15 @@ class PresentationSlideGenerator:
         """Generate an image for a single slide using Gemini."""
         try:
             prompt = self.generate_image_prompt(slide, original_slide_image_path)
+
+            # Create image filename with simple template: slide_<number>.png
+            image_filename = f"slide_{slide['slide_number']:02d}.png"
+            image_path = output_dir / image_filename
+
+            cache_path = self._image_cache_path(prompt, original_slide_image_path)
+            if self._load_cached_image(cache_path, image_path):
+                return image_path
+
             self.logger.info(
                 f"Starting image generation for slide {slide['slide_number']}: {slide['title']}"
             )
@@ -194,6 +293,8 @@ class PresentationSlideGenerator:
             # Include original slide image if provided
             if original_slide_image_path and original_slide_image_path.exists():
                 try:
+                    from PIL import Image
+
                     original_image = Image.open(original_slide_image_path)
                     contents.append(original_image)
                     self.logger.info(
@@ -205,15 +306,15 @@ class PresentationSlideGenerator:
                     )
 
             # Generate image using Gemini client
-            response = self.client.models.generate_content(
-                model="gemini-2.5-flash-image-preview",
+            response = generate_content(
+                self.client,
+                model=IMAGE_MODEL,
+                config=types.GenerateContentConfig(
+                    system_instruction=SLIDE_STYLE_INSTRUCTION
+                ),
                 contents=contents,
             )
 
-            # Create image filename with simple template: slide_<number>.png
-            image_filename = f"slide_{slide['slide_number']:02d}.png"
-            image_path = output_dir / image_filename
-
             # Process response and save image
             image_saved = False
             for part in response.candidates[0].content.parts:
@@ -221,8 +322,8 @@ class PresentationSlideGenerator:
                     self.logger.info(f"Text response: {part.text}")
                 elif part.inline_data is not None:
                     # Save the generated image
-                    image = Image.open(BytesIO(part.inline_data.data))
-                    image.save(image_path)
+                    self._save_image_part(part, image_path)
+                    self._store_cached_image(image_path, cache_path)
                     image_saved = True
                     self.logger.info(f"Image saved: {image_path}")
                     break
@@ -243,14 +344,165 @@ class PresentationSlideGenerator:
             self.logger.error(f"Failed slide {slide['slide_number']}: {e}")
             return None
 
+    def generate_slide_images_batch(
+        self, slides: List[Dict[str, str]], output_dir: Path
+    ) -> List[Optional[Path]]:
+        """Generate images for several slides with a single Gemini call.
+
+        Slides with a cached image are copied from the cache and left out of
+        the request. Falls back to one call per slide if the request fails or the response
+        does not contain exactly one image per slide.
+
+        Returns:
+            Image paths aligned with slides, with None for slides that failed.
+        """
+        if len(slides) == 1:
+            return [self.generate_slide_image(slides[0], output_dir)]
+
+        # Copy slides with a cached image and only send the rest to Gemini
+        image_paths = {}
+        pending = []
+        for slide in slides:
+            prompt = self.generate_image_prompt(slide)
+            cache_path = self._image_cache_path(prompt)
+            image_path = output_dir / f"slide_{slide['slide_number']:02d}.png"
+            if self._load_cached_image(cache_path, image_path):
+                image_paths[slide["slide_number"]] = image_path
+            else:
+                pending.append((slide, prompt, cache_path))
+
+        if len(pending) == 1:
+            slide = pending[0][0]
+            image_paths[slide["slide_number"]] = self.generate_slide_image(
+                slide, output_dir
+            )
+        elif pending:
+            image_paths.update(self._generate_uncached_batch(pending, output_dir))
+
+        return [image_paths.get(slide["slide_number"]) for slide in slides]
+
+    @staticmethod
+    def _match_labelled_images(
+        parts: List[types.Part], count: int
+    ) -> Optional[List[types.Part]]:
+        """Match the images of a batched response to their slide image labels.
+
+        Each image must follow a text part whose last label names its position,
+        and every position from 1 to count must be labelled exactly once.
+
+        Returns:
+            Image parts in slide image order, or None if they cannot be matched
+        """
+        images = {}
+        position = None
+        for part in parts:
+            if part.text is not None:
+                labels = BATCH_IMAGE_LABEL_PATTERN.findall(part.text)
+                if labels:
+                    position = int(labels[-1])
+            elif part.inline_data is not None:
+                if position is None or position in images:
+                    return None
+                images[position] = part
+                position = None
+
+        if sorted(images) != list(range(1, count + 1)):
+            return None
+        return [images[position] for position in range(1, count + 1)]
+
+    def _generate_uncached_batch(
+        self, pending: List[Tuple[Dict[str, str], str, Path]], output_dir: Path
+    ) -> Dict[int, Optional[Path]]:
+        """Generate images for (slide, prompt, cache path) entries with one Gemini call.
+
+        Returns:
+            Image paths keyed by slide number, with None for slides that failed.
+        """
+        slides = [slide for slide, _, _ in pending]
+        slide_numbers = ", ".join(str(slide["slide_number"]) for slide in slides)
+        try:
+            label = BATCH_IMAGE_LABEL.format(position="N")
+            prompt_parts = [
+                f"Generate {len(slides)} separate presentation slide images, one image per slide, "
+                f"in the order listed below. Return exactly {len(slides)} images.",
+                f"Immediately before the image for slide image N, write a line containing exactly {label}.",
+            ]
+            for position, (_, prompt, _) in enumerate(pending, 1):
+                prompt_parts.extend(
+                    [
+                        "",
+                        f"--- Slide image {position} of {len(slides)} ---",
+                        prompt,
+                    ]
+                )
+
+            self.logger.info(
+                f"Starting batched image generation for slides {slide_numbers}"
+            )
+            response = generate_content(
+                self.client,
+                model=IMAGE_MODEL,
+                config=types.GenerateContentConfig(
+                    system_instruction=SLIDE_STYLE_INSTRUCTION
+                ),
+                contents=["\n".join(prompt_parts)],
+            )
+
+            image_parts = self._match_labelled_images(
+                response.candidates[0].content.parts, len(slides)
+            )
+            if image_parts is None:
+                self.logger.warning(
+                    f"Could not match the images for slides {slide_numbers} to their labels. "
+                    "Falling back to per-slide generation"
+                )
+                return {
+                    slide["slide_number"]: self.generate_slide_image(slide, output_dir)
+                    for slide in slides
+                }
+
+            # Images are only cached under a slide's key once their label has
+            # matched them to that slide
+            image_paths = {}
+            for (slide, _, cache_path), part in zip(pending, image_parts):
+                image_path = output_dir / f"slide_{slide['slide_number']:02d}.png"
+                self._save_image_part(part, image_path)
+                self._store_cached_image(image_path, cache_path)
+                self.logger.info(f"Image saved: {image_path}")
+                image_paths[slide["slide_number"]] = image_path
+            return image_paths
+
+        except Exception as e:
+            self.logger.error(
+                f"Failed batched generation for slides {slide_numbers}: {e}. "
+                "Falling back to per-slide generation"
+            )
+            return {
+                slide["slide_number"]: self.generate_slide_image(slide, output_dir)
+                for slide in slides
+            }
+
     def generate_all_slide_images(
-        self, presentation_path: Path, output_dir: Path
+        self,
+        presentation_path: Path,
+        output_dir: Path,
+        max_concurrency: int = 3,
+        batch_size: int = 1,
+        markdown_content: Optional[str] = None,
     ) -> List[Path]:
-        """Generate images for all slides in the presentation."""
+        """Generate images for all slides in the presentation.
+
+        Slides are grouped into batches of batch_size slides per Gemini call,
+        and batches run concurrently on a thread pool bounded by
+        max_concurrency to stay within Gemini rate limits.
+
+        If the caller already holds the presentation markdown it can pass it
+        as markdown_content, and presentation_path is not read again.
+        """
         try:
-            # Read the presentation markdown
-            with open(presentation_path, "r", encoding="utf-8") as f:
-                markdown_content = f.read()
+            # Read the presentation markdown unless it was passed in
+            if markdown_content is None:
+                markdown_content = presentation_path.read_text(encoding="utf-8")
 
             # Parse slides
             slides = self.parse_presentation_skeleton(markdown_content)
@@ -261,17 +513,40 @@ class PresentationSlideGenerator:
             output_dir.mkdir(parents=True, exist_ok=True)
 
             # Generate images for each slide
-            generated_images = []
+            generated_images = {}
             total_slides = len(slides)
-
-            for i, slide in enumerate(slides, 1):
-                self.logger.info(f"Processing slide {i}/{total_slides}")
-                image_path = self.generate_slide_image(slide, output_dir)
-                if image_path:
-                    generated_images.append(image_path)
-                    self.logger.info(f"Progress: {i}/{total_slides} slides completed")
-                else:
-                    self.logger.warning(f"Slide {i} failed to generate")
+            completed = 0
+
+            with ThreadPoolExecutor(
+                max_workers=max(1, max_concurrency), thread_name_prefix="slide-image"
+            ) as executor:
+                futures = {}
+                batch_size = max(1, batch_size)
+                for start in range(0, total_slides, batch_size):
+                    batch = slides[start : start + batch_size]
+                    self.logger.info(
+                        f"Queueing slides {start + 1}-{start + len(batch)}/{total_slides}"
+                    )
+                    futures[
+                        executor.submit(
+                            self.generate_slide_images_batch, batch, output_dir
+                        )
+                    ] = batch
+
+                for future in as_completed(futures):
+                    for slide, image_path in zip(futures[future], future.result()):
+                        i = slide["slide_number"]
+                        completed += 1
+                        if image_path:
+                            generated_images[i] = image_path
+                            self.logger.info(
+                                f"Progress: {completed}/{total_slides} slides completed"
+                            )
+                        else:
+                            self.logger.warning(f"Slide {i} failed to generate")
+
+            # Return images in slide order regardless of completion order
+            generated_images = [generated_images[i] for i in sorted(generated_images)]
 
             self.logger.info(
                 f"Slide generation complete: {len(generated_images)}/{total_slides} images generated successfully"
@@ -282,6 +557,69 @@ class PresentationSlideGenerator:
             self.logger.error(f"Error generating slide images: {e}")
             return []
 
+    def generate_slide_images_from_stream(
+        self,
+        chunks: Iterable[str],
+        output_dir: Path,
+        max_concurrency: int = 3,
+    ) -> Tuple[str, List[Path]]:
+        """Generate slide images while the presentation skeleton is still streaming.
+
+        A slide is complete once the next "## " header starts, so each time one
+        arrives the slides before it are queued for image generation.
+
+        Args:
+            chunks: Presentation skeleton markdown, in order, as it is generated
+            output_dir: Directory to save the slide images to
+            max_concurrency: Maximum number of image requests in flight
+
+        Returns:
+            Tuple of (complete skeleton markdown, generated image paths in slide order)
+        """
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        buffer = ""
+        queued = 0
+        futures = {}
+        with ThreadPoolExecutor(
+            max_workers=max(1, max_concurrency), thread_name_prefix="slide-image"
+        ) as executor:
+
+            def queue_slides(markdown_content: str) -> None:
+                nonlocal queued
+                slides = self.parse_presentation_skeleton(markdown_content)
+                for slide in slides[queued:]:
+                    self.logger.info(
+                        f"Queueing slide {slide['slide_number']}: {slide['title']}"
+                    )
+                    futures[slide["slide_number"]] = executor.submit(
+                        self.generate_slide_image, slide, output_dir
+                    )
+                queued = len(slides)
+
+            for chunk in chunks:
+                buffer += chunk
+                # Everything before the last header is final; parse only that
+                boundary = buffer.rfind("## ")
+                if boundary > 0:
+                    queue_slides(buffer[:boundary])
+
+            # The stream is finished, so the last slide is complete too
+            queue_slides(buffer)
+
+            generated_images = []
+            for i in sorted(futures):
+                image_path = futures[i].result()
+                if image_path:
+                    generated_images.append(image_path)
+                else:
+                    self.logger.warning(f"Slide {i} failed to generate")
+
+        self.logger.info(
+            f"Slide generation complete: {len(generated_images)}/{queued} images generated successfully"
+        )
+        return buffer, generated_images
+
     def create_slides_summary(
         self,
         slides: List[Dict[str, str]],
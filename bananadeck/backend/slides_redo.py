@@ -1,39 +1,146 @@
+import functools
+import hashlib
 import logging
+import os
 import re
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Set, Tuple, Union
 
 from google import genai
 from google.genai import types
 
+from ._retry import generate_content, generate_content_stream
+from . import input2md
+from .input2md import atomic_write_text
 from .md2skeleton import MarkdownToPresentationSkeleton
-from .skeleton2slides import PresentationSlideGenerator
+from .skeleton2slides import PresentationSlideGenerator, _parse_presentation_skeleton
+
+EXPANSION_MODEL = "gemini-2.0-flash-exp"
+
+# Instructions shared by every expansion, sent as the system instruction so
+# requests only differ in their slide and transcript content
+EXPANSION_INSTRUCTION = """You are a professional presentation designer. I need you to expand a single slide into 3 separate slides that provide more detailed coverage of the content.
+
+TASK: Create 3 new slides that expand on this content. The slides should:
+1. Provide more detailed coverage of the topic
+2. Include additional context from the transcript
+3. Maintain logical flow and progression
+4. Each slide should be substantial and meaningful
+5. **CRITICAL: When creating visual suggestions, ensure they match the theming and style of the original slide image**
+
+OUTPUT FORMAT:
+## Slide X: [New Title]
+- [Detailed point 1]
+- [Detailed point 2]
+- [Detailed point 3]
+- **Visual suggestion:** [specific visual description that matches the original slide's theming, color scheme, and visual style]
+
+## Slide Y: [New Title]
+- [Detailed point 1]
+- [Detailed point 2]
+- [Detailed point 3]
+- **Visual suggestion:** [specific visual description that matches the original slide's theming, color scheme, and visual style]
+
+## Slide Z: [New Title]
+- [Detailed point 1]
+- [Detailed point 2]
+- [Detailed point 3]
+- **Visual suggestion:** [specific visual description that matches the original slide's theming, color scheme, and visual style]
+
+IMPORTANT:
+- Use the exact format above with "## Slide X:" headers
+- Include visual suggestions using the exact format "- **Visual suggestion:**"
+- Make each slide substantial and informative
+- Draw additional details from the transcript content
+- Maintain professional presentation standards
+- **THEMING REQUIREMENT: All visual suggestions must maintain consistency with the original slide's design theme, color palette, and visual style to ensure a cohesive presentation experience**"""
+
+# Used to pack several slides into one expansion request
+BATCH_EXPANSION_PROMPT = """You will receive {count} separate slides to expand. Each one starts with a line of the form === SLIDE N ===.
+Expand every slide separately, following the instructions for each one.
+Start the expansion of slide N with a line containing exactly === EXPANSION N === and do not write anything else between expansions."""
+EXPANSION_DELIMITER_PATTERN = re.compile(
+    r"^=== EXPANSION (\d+) ===[ \t]*$", re.MULTILINE
+)
+
+# Slides with at least this many bullets, or this much bullet text, already
+# hold enough content for 3 slides and are split without asking Gemini
+DIRECT_SPLIT_MIN_BULLETS = 6
+DIRECT_SPLIT_MIN_CHARS = 600
+
+# Version folders (v0, v1, ...) inside a presentation's output folder
+VERSION_DIR_PATTERN = re.compile(r"v(\d+)")
+
+# Blank lines separating transcript paragraphs/sections
+PARAGRAPH_PATTERN = re.compile(r"\n\n")
+
+# Words longer than three characters, used to match slides to transcript sections
+WORD_PATTERN = re.compile(r"\w{4,}")
+
+
+@functools.lru_cache(maxsize=2)
+def _index_transcript(transcript_content: str) -> Tuple[Tuple[int, int], ...]:
+    """Find the paragraph/section offsets of a transcript.
+
+    Offsets are taken on the original text, since lowercasing can change its
+    length. Sections are walked by offset rather than split into a list of
+    copies, so only the candidates that are scored get sliced out.
+
+    Returns:
+        (start, end) offsets of every section, in order
+    """
+    starts = [0]
+    starts.extend(
+        match.end() for match in PARAGRAPH_PATTERN.finditer(transcript_content)
+    )
+    ends = [start - 2 for start in starts[1:]]
+    ends.append(len(transcript_content))
+    return tuple(zip(starts, ends))
+
+
+def _list_file_names(directory: Path) -> Optional[Set[str]]:
+    """Return the names of the files in directory, or None if it does not exist."""
+    try:
+        with os.scandir(directory) as entries:
+            return {entry.name for entry in entries if entry.is_file()}
+    except FileNotFoundError:
+        return None
 
 
 class SlideExpander:
     """Handles expansion of individual slides by splitting them into multiple slides."""
 
-    def __init__(self, api_key: str, logger: logging.Logger):
+    def __init__(
+        self,
+        api_key: str,
+        logger: logging.Logger,
+        cache_dir: Optional[Path] = None,
+        client: Optional[genai.Client] = None,
+    ):
         self.api_key = api_key
         self.logger = logger
-        self.client = genai.Client(api_key=api_key)
+        # Raw Gemini expansions keyed by a hash of their prompt. OUTPUTS_DIR is
+        # looked up here rather than imported, so overriding it moves the cache
+        self.cache_dir = cache_dir or input2md.OUTPUTS_DIR / ".cache" / "expansions"
+        self.client = client or genai.Client(api_key=api_key)
+        # Share the client so every stage reuses the same connection pool
         self.presentation_generator = MarkdownToPresentationSkeleton(
-            api_key=api_key, logger=logger
+            api_key=api_key, logger=logger, client=self.client
         )
         self.slide_generator = PresentationSlideGenerator(
-            logger=logger, api_key=api_key
+            logger=logger, api_key=api_key, client=self.client
         )
 
     def find_slide_in_skeleton(
         self, presentation_content: str, slide_number: int
     ) -> Optional[Dict[str, str]]:
         """Find a specific slide in the presentation skeleton and extract its content."""
-        slides = self.slide_generator.parse_presentation_skeleton(presentation_content)
-
-        for slide in slides:
+        # Search the cached parse and only copy the slide that is returned
+        for slide in _parse_presentation_skeleton(presentation_content):
             if slide["slide_number"] == slide_number:
-                return slide
+                return dict(slide, bullet_points=list(slide["bullet_points"]))
 
         return None
 
@@ -41,185 +148,388 @@ class SlideExpander:
         self, slide: Dict[str, str], transcript_content: str
     ) -> str:
         """Find the relevant transcript content that corresponds to a slide."""
-        # Extract key terms from the slide to search in transcript
-        search_terms = []
-
-        # Add title words
-        title_words = slide["title"].lower().split()
-        search_terms.extend([word for word in title_words if len(word) > 3])
-
-        # Add bullet point words
-        for bullet in slide["bullet_points"]:
-            bullet_words = bullet.lower().split()
-            search_terms.extend([word for word in bullet_words if len(word) > 3])
-
-        # Remove common words and duplicates
-        common_words = {
-            "the",
-            "and",
-            "for",
-            "are",
-            "but",
-            "not",
-            "you",
-            "all",
-            "can",
-            "had",
-            "her",
-            "was",
-            "one",
-            "our",
-            "out",
-            "day",
-            "get",
-            "has",
-            "him",
-            "his",
-            "how",
-            "its",
-            "may",
-            "new",
-            "now",
-            "old",
-            "see",
-            "two",
-            "way",
-            "who",
-            "boy",
-            "did",
-            "man",
-            "men",
-            "put",
-            "say",
-            "she",
-            "too",
-            "use",
+        # Extract key terms from the slide title and bullet points, without
+        # common words, to search in transcript
+        search_terms = {
+            word
+            for text in (slide["title"], *slide["bullet_points"])
+            for word in WORD_PATTERN.findall(text.lower())
         }
-        search_terms = list(
-            set([term for term in search_terms if term not in common_words])
-        )
-
-        # Find the most relevant section in transcript
-        transcript_lower = transcript_content.lower()
-        best_match = ""
+        if not search_terms:
+            # No section can match, so skip tokenizing the transcript
+            return transcript_content[:1000]
+
+        # Find the most relevant section in transcript. Lowercasing changes the
+        # length of some characters (e.g. "İ"), so the cached offsets and the
+        # length filter use the original text and each candidate section is
+        # lowercased on its own. Slides expanded from the same transcript share
+        # the offsets
+        sections = _index_transcript(transcript_content)
+        best_bounds = None
         max_matches = 0
 
-        # Split transcript into paragraphs/sections
-        sections = transcript_content.split("\n\n")
-
-        for section in sections:
-            if len(section.strip()) < 50:  # Skip very short sections
+        for start, end in sections:
+            if end - start < 50:  # Skip very short sections
+                continue
+            section = transcript_content[start:end]
+            if len(section.strip()) < 50:
                 continue
 
-            section_lower = section.lower()
-            matches = sum(1 for term in search_terms if term in section_lower)
+            # Tokenize the section once and count the slide's words it contains
+            matches = len(
+                search_terms.intersection(WORD_PATTERN.findall(section.lower()))
+            )
 
             if matches > max_matches:
                 max_matches = matches
-                best_match = section
+                best_bounds = (start, end)
+                # No later section can match more terms than all of them
+                if max_matches == len(search_terms):
+                    break
 
-        return (
-            best_match if best_match else transcript_content[:1000]
-        )  # Fallback to first 1000 chars
+        if best_bounds is None:
+            return transcript_content[:1000]  # Fallback to first 1000 chars
 
-    def expand_slide_content(
-        self, slide: Dict[str, str], transcript_content: str
-    ) -> List[Dict[str, str]]:
-        """Expand a single slide into 3 slides using AI."""
-        self.logger.info(f"Expanding slide {slide['slide_number']}: {slide['title']}")
+        start, end = best_bounds
+        return transcript_content[start:end]
 
+    def _expansion_prompt(self, slide: Dict[str, str], transcript_content: str) -> str:
+        """Build the per-slide part of the expansion prompt."""
         # Find relevant transcript content
         relevant_transcript = self.find_transcript_content_for_slide(
             slide, transcript_content
         )
 
-        prompt = f"""You are a professional presentation designer. I need you to expand a single slide into 3 separate slides that provide more detailed coverage of the content.
-
-ORIGINAL SLIDE:
+        return f"""ORIGINAL SLIDE:
 Title: {slide['title']}
 Content:
 {chr(10).join(f"- {point}" for point in slide['bullet_points'])}
 
 RELEVANT TRANSCRIPT CONTENT:
-{relevant_transcript}
-
-TASK: Create 3 new slides that expand on this content. The slides should:
-1. Provide more detailed coverage of the topic
-2. Include additional context from the transcript
-3. Maintain logical flow and progression
-4. Each slide should be substantial and meaningful
-5. **CRITICAL: When creating visual suggestions, ensure they match the theming and style of the original slide image**
-
-OUTPUT FORMAT:
-## Slide X: [New Title]
-- [Detailed point 1]
-- [Detailed point 2]
-- [Detailed point 3]
-- **Visual suggestion:** [specific visual description that matches the original slide's theming, color scheme, and visual style]
-
-## Slide Y: [New Title]
-- [Detailed point 1]
-- [Detailed point 2]
-- [Detailed point 3]
-- **Visual suggestion:** [specific visual description that matches the original slide's theming, color scheme, and visual style]
+{relevant_transcript}"""
+
+    def _expansion_cache_path(self, prompt: str) -> Path:
+        """Return the cache path for the expansion generated from prompt."""
+        # Identical slide content and transcript context give an identical prompt
+        key = hashlib.blake2b(digest_size=16)
+        key.update(EXPANSION_MODEL.encode("utf-8"))
+        key.update(EXPANSION_INSTRUCTION.encode("utf-8"))
+        key.update(prompt.encode("utf-8"))
+        return self.cache_dir / f"{key.hexdigest()}.md"
+
+    def _parse_expansion(
+        self, slide: Dict[str, str], expanded_content: str, cache_path: Path
+    ) -> List[Dict[str, str]]:
+        """Parse expanded slide markdown into exactly 3 slides, caching usable responses."""
+        # Parse the response to extract the 3 slides
+        expanded_slides = self.slide_generator.parse_presentation_skeleton(
+            expanded_content
+        )
+        # Only cache well-formed responses, so truncated or malformed ones
+        # are requested again on the next run instead of being padded forever
+        if len(expanded_slides) == 3 and not cache_path.exists():
+            atomic_write_text(cache_path, expanded_content)
+
+        # Ensure we have exactly 3 slides
+        if len(expanded_slides) != 3:
+            self.logger.warning(
+                f"Expected 3 slides, got {len(expanded_slides)}. Adjusting..."
+            )
+            # If we don't have exactly 3, take the first 3 or pad with the original
+            if len(expanded_slides) > 3:
+                expanded_slides = expanded_slides[:3]
+            else:
+                # Pad with modified versions of the original slide
+                while len(expanded_slides) < 3:
+                    original_copy = slide.copy()
+                    original_copy["title"] = (
+                        f"{slide['title']} (Part {len(expanded_slides) + 1})"
+                    )
+                    expanded_slides.append(original_copy)
 
-## Slide Z: [New Title]
-- [Detailed point 1]
-- [Detailed point 2]
-- [Detailed point 3]
-- **Visual suggestion:** [specific visual description that matches the original slide's theming, color scheme, and visual style]
+        self.logger.info(
+            f"Successfully expanded slide into {len(expanded_slides)} slides"
+        )
+        return expanded_slides
+
+    def _fallback_expansion(self, slide: Dict[str, str]) -> List[Dict[str, str]]:
+        """Create 3 simple variations of the original slide."""
+        fallback_slides = []
+        for i in range(3):
+            fallback_slide = slide.copy()
+            fallback_slide["title"] = f"{slide['title']} (Part {i + 1})"
+            fallback_slides.append(fallback_slide)
+        return fallback_slides
+
+    def _split_without_model(
+        self, slide: Dict[str, str]
+    ) -> Optional[List[Dict[str, str]]]:
+        """Split a content-heavy slide's bullets into 3 slides without calling Gemini.
+
+        Returns:
+            The 3 slides, or None if the slide is too light to split directly
+        """
+        bullet_points = slide["bullet_points"]
+        total_chars = sum(len(point) for point in bullet_points)
+        if len(bullet_points) < DIRECT_SPLIT_MIN_BULLETS and not (
+            len(bullet_points) >= 3 and total_chars >= DIRECT_SPLIT_MIN_CHARS
+        ):
+            return None
 
-IMPORTANT:
-- Use the exact format above with "## Slide X:" headers
-- Include visual suggestions using the exact format "- **Visual suggestion:**"
-- Make each slide substantial and informative
-- Draw additional details from the transcript content
-- Maintain professional presentation standards
-- **THEMING REQUIREMENT: All visual suggestions must maintain consistency with the original slide's design theme, color palette, and visual style to ensure a cohesive presentation experience**"""
+        self.logger.info(
+            f"Slide {slide['slide_number']} has {len(bullet_points)} bullets ({total_chars} chars); "
+            "splitting it directly without Gemini"
+        )
+        split_slides = []
+        for i in range(3):
+            # Contiguous groups whose sizes differ by at most one
+            start = i * len(bullet_points) // 3
+            end = (i + 1) * len(bullet_points) // 3
+            split_slide = slide.copy()
+            split_slide["title"] = f"{slide['title']} (Part {i + 1})"
+            split_slide["bullet_points"] = bullet_points[start:end]
+            if i > 0:
+                # The visual belongs to the original slide; repeating it would
+                # render the same image three times
+                split_slide["visual_suggestion"] = None
+            split_slides.append(split_slide)
+        return split_slides
+
+    def _stream_expansion(
+        self,
+        prompt: str,
+        on_slide: Optional[Callable[[int, Dict[str, str]], None]] = None,
+    ) -> str:
+        """Stream a single slide expansion, stopping once 3 slides are complete.
+
+        A slide is complete once the next "## " header starts, so the stream is
+        closed as soon as a fourth slide begins. Falls back to a regular request
+        if the stream fails part-way through.
+
+        Args:
+            prompt: The per-slide expansion prompt
+            on_slide: Called with the index and content of each of the first 3
+                slides as soon as it is complete, before the stream ends
+
+        Returns:
+            The expansion markdown, holding at most 3 complete slides
+        """
+        config = types.GenerateContentConfig(system_instruction=EXPANSION_INSTRUCTION)
+        buffer = ""
+        reported = 0
+
+        def report(complete_slides: List[Dict[str, str]]) -> None:
+            nonlocal reported
+            if on_slide is None:
+                return
+            for index in range(reported, min(len(complete_slides), 3)):
+                on_slide(index, complete_slides[index])
+                reported = index + 1
 
         try:
-            response = self.client.models.generate_content(
-                model="gemini-2.0-flash-exp",
+            stream = generate_content_stream(
+                self.client,
+                model=EXPANSION_MODEL,
                 contents=[types.Part(text=prompt)],
+                config=config,
             )
+            try:
+                for chunk in stream:
+                    buffer += chunk.text or ""
+                    # Everything before the last header is final; parse only that
+                    boundary = buffer.rfind("## ")
+                    if boundary <= 0:
+                        continue
+
+                    complete_slides = self.slide_generator.parse_presentation_skeleton(
+                        buffer[:boundary]
+                    )
+                    report(complete_slides)
+                    if len(complete_slides) >= 3:
+                        self.logger.info(
+                            "Got 3 expanded slides; stopping the stream early"
+                        )
+                        return buffer[:boundary]
+            finally:
+                # Closing the stream cancels the rest of the generation
+                stream.close()
+
+            # The stream is finished, so the last slide is complete too
+            report(self.slide_generator.parse_presentation_skeleton(buffer))
+            return buffer
 
-            # Parse the response to extract the 3 slides
-            expanded_content = response.text
-            expanded_slides = self.slide_generator.parse_presentation_skeleton(
-                expanded_content
+        except Exception as e:
+            self.logger.warning(
+                f"Streaming slide expansion failed: {e}. Falling back to a regular request"
             )
+            response = generate_content(
+                self.client,
+                model=EXPANSION_MODEL,
+                contents=[types.Part(text=prompt)],
+                config=config,
+            )
+            return response.text
 
-            # Ensure we have exactly 3 slides
-            if len(expanded_slides) != 3:
-                self.logger.warning(
-                    f"Expected 3 slides, got {len(expanded_slides)}. Adjusting..."
+    def expand_slide_content(
+        self,
+        slide: Dict[str, str],
+        transcript_content: str,
+        on_slide: Optional[
+            Callable[[Dict[str, str], int, Dict[str, str]], None]
+        ] = None,
+    ) -> List[Dict[str, str]]:
+        """Expand a single slide into 3 slides using AI.
+
+        If given, on_slide is called with the original slide, the index and the
+        content of each new slide as soon as it has streamed in. Slides reported
+        this way may still differ from the returned ones if the stream fails.
+        """
+        self.logger.info(f"Expanding slide {slide['slide_number']}: {slide['title']}")
+
+        split_slides = self._split_without_model(slide)
+        if split_slides is not None:
+            return split_slides
+
+        prompt = self._expansion_prompt(slide, transcript_content)
+        return self._expand_from_prompt(
+            slide, prompt, self._expansion_cache_path(prompt), on_slide
+        )
+
+    def _expand_from_prompt(
+        self,
+        slide: Dict[str, str],
+        prompt: str,
+        cache_path: Path,
+        on_slide: Optional[
+            Callable[[Dict[str, str], int, Dict[str, str]], None]
+        ] = None,
+    ) -> List[Dict[str, str]]:
+        """Expand a slide whose prompt is already built, so the transcript is only searched once."""
+        try:
+            if cache_path.exists():
+                self.logger.info(f"Using cached slide expansion: {cache_path}")
+                expanded_content = cache_path.read_text(encoding="utf-8")
+            else:
+                expanded_content = self._stream_expansion(
+                    prompt,
+                    functools.partial(on_slide, slide) if on_slide else None,
                 )
-                # If we don't have exactly 3, take the first 3 or pad with the original
-                if len(expanded_slides) > 3:
-                    expanded_slides = expanded_slides[:3]
-                else:
-                    # Pad with modified versions of the original slide
-                    while len(expanded_slides) < 3:
-                        original_copy = slide.copy()
-                        original_copy["title"] = (
-                            f"{slide['title']} (Part {len(expanded_slides) + 1})"
-                        )
-                        expanded_slides.append(original_copy)
 
-            self.logger.info(
-                f"Successfully expanded slide into {len(expanded_slides)} slides"
-            )
-            return expanded_slides
+            return self._parse_expansion(slide, expanded_content, cache_path)
 
         except Exception as e:
             self.logger.error(f"Error expanding slide: {e}")
             # Fallback: create 3 simple variations of the original slide
-            fallback_slides = []
-            for i in range(3):
-                fallback_slide = slide.copy()
-                fallback_slide["title"] = f"{slide['title']} (Part {i + 1})"
-                fallback_slides.append(fallback_slide)
-            return fallback_slides
+            return self._fallback_expansion(slide)
+
+    def expand_slides_content(
+        self,
+        slides: List[Dict[str, str]],
+        transcript_content: str,
+        max_concurrency: int = 3,
+        on_slide: Optional[
+            Callable[[Dict[str, str], int, Dict[str, str]], None]
+        ] = None,
+    ) -> List[List[Dict[str, str]]]:
+        """Expand several slides into 3 slides each with a single Gemini call.
+
+        Slides with a cached expansion, or enough content to split directly,
+        are left out of the request. Falls back
+        to one call per slide if the request fails or the response does not
+        contain one delimited expansion per slide; those calls run
+        concurrently, at most max_concurrency at a time, reuse the prompts
+        already built for the batch, and report each new slide to on_slide as
+        it streams in (see expand_slide_content).
+
+        Returns:
+            Expanded slides for each input slide, in the same order as slides
+        """
+        expansions = {}
+        pending = []
+        for slide in slides:
+            split_slides = self._split_without_model(slide)
+            if split_slides is not None:
+                expansions[slide["slide_number"]] = split_slides
+                continue
+
+            prompt = self._expansion_prompt(slide, transcript_content)
+            cache_path = self._expansion_cache_path(prompt)
+            if cache_path.exists():
+                self.logger.info(
+                    f"Using cached slide expansion for slide {slide['slide_number']}: {cache_path}"
+                )
+                expansions[slide["slide_number"]] = self._parse_expansion(
+                    slide, cache_path.read_text(encoding="utf-8"), cache_path
+                )
+            else:
+                pending.append((slide, prompt, cache_path))
+
+        if len(pending) == 1:
+            slide, prompt, cache_path = pending[0]
+            expansions[slide["slide_number"]] = self._expand_from_prompt(
+                slide, prompt, cache_path, on_slide
+            )
+        elif pending:
+            slide_numbers = ", ".join(
+                str(slide["slide_number"]) for slide, _, _ in pending
+            )
+            self.logger.info(f"Expanding slides {slide_numbers} in one request")
+            try:
+                contents = [
+                    types.Part(text=BATCH_EXPANSION_PROMPT.format(count=len(pending)))
+                ]
+                for position, (_, prompt, _) in enumerate(pending, 1):
+                    contents.append(
+                        types.Part(text=f"=== SLIDE {position} ===\n{prompt}")
+                    )
+
+                response = generate_content(
+                    self.client,
+                    model=EXPANSION_MODEL,
+                    contents=contents,
+                    config=types.GenerateContentConfig(
+                        system_instruction=EXPANSION_INSTRUCTION
+                    ),
+                )
+
+                # re.split with one capture group yields [preamble, number, body, ...]
+                pieces = EXPANSION_DELIMITER_PATTERN.split(response.text)
+                bodies = {
+                    int(number): body
+                    for number, body in zip(pieces[1::2], pieces[2::2])
+                }
+                if sorted(bodies) != list(range(1, len(pending) + 1)):
+                    raise ValueError(
+                        f"expected {len(pending)} delimited expansions, got {len(bodies)}"
+                    )
+
+                for position, (slide, _, cache_path) in enumerate(pending, 1):
+                    expansions[slide["slide_number"]] = self._parse_expansion(
+                        slide, bodies[position], cache_path
+                    )
+
+            except Exception as e:
+                self.logger.warning(
+                    f"Batched expansion of slides {slide_numbers} failed: {e}. "
+                    "Falling back to one request per slide"
+                )
+                # The requests are independent, so overlap their latency
+                with ThreadPoolExecutor(
+                    max_workers=max(1, max_concurrency),
+                    thread_name_prefix="slide-expansion",
+                ) as executor:
+                    pending_slides, prompts, cache_paths = zip(*pending)
+                    fallbacks = executor.map(
+                        self._expand_from_prompt,
+                        pending_slides,
+                        prompts,
+                        cache_paths,
+                        [on_slide] * len(pending),
+                    )
+                    for slide, expanded_slides in zip(pending_slides, fallbacks):
+                        expansions[slide["slide_number"]] = expanded_slides
+
+        return [expansions[slide["slide_number"]] for slide in slides]
 
     def create_expanded_presentation(
         self,
@@ -228,63 +538,95 @@ IMPORTANT:
         expanded_slides: List[Dict[str, str]],
     ) -> str:
         """Create a new presentation with the expanded slides replacing the original."""
-        # Parse the original presentation
         original_slides = self.slide_generator.parse_presentation_skeleton(
             original_presentation
         )
-
-        # Find the slide to replace
-        target_slide_index = None
-        for i, slide in enumerate(original_slides):
-            if slide["slide_number"] == slide_number:
-                target_slide_index = i
-                break
-
-        if target_slide_index is None:
+        if not any(slide["slide_number"] == slide_number for slide in original_slides):
             raise ValueError(f"Slide {slide_number} not found in presentation")
 
-        # Create new slides list with expanded content
-        new_slides = []
-
-        # Add slides before the target
-        for i in range(target_slide_index):
-            new_slides.append(original_slides[i])
-
-        # Add the 3 expanded slides
-        for i, expanded_slide in enumerate(expanded_slides):
-            new_slide = expanded_slide.copy()
-            new_slide["slide_number"] = target_slide_index + i + 1
-            new_slides.append(new_slide)
-
-        # Add remaining slides with updated numbers
-        for i in range(target_slide_index + 1, len(original_slides)):
-            remaining_slide = original_slides[i].copy()
-            remaining_slide["slide_number"] = (
-                remaining_slide["slide_number"] + 2
-            )  # +2 because we replaced 1 slide with 3 slides (net +2)
-            new_slides.append(remaining_slide)
-
-        # Convert back to markdown format
+        new_slides, _ = self._splice_expansions(
+            original_slides, {slide_number: expanded_slides}
+        )
         return self._slides_to_markdown(new_slides)
 
     def _slides_to_markdown(self, slides: List[Dict[str, str]]) -> str:
         """Convert slides back to markdown presentation format."""
-        markdown_parts = ["# Expanded Presentation\n"]
+        blocks = ["# Expanded Presentation\n"]
 
         for slide in slides:
-            markdown_parts.append(f"## Slide {slide['slide_number']}: {slide['title']}")
+            bullets = "".join(f"\n- {point}" for point in slide["bullet_points"])
+            visual = (
+                f"\n- **Visual suggestion:** {slide['visual_suggestion']}"
+                if slide.get("visual_suggestion")
+                else ""
+            )
+            # Each block ends with an empty line between slides
+            blocks.append(
+                f"## Slide {slide['slide_number']}: {slide['title']}{bullets}{visual}\n"
+            )
 
-            for point in slide["bullet_points"]:
-                markdown_parts.append(f"- {point}")
+        return "\n".join(blocks)
 
-            if slide.get("visual_suggestion"):
-                markdown_parts.append(
-                    f"- **Visual suggestion:** {slide['visual_suggestion']}"
-                )
+    def _splice_expansions(
+        self,
+        original_slides: List[Dict[str, str]],
+        expansions: Dict[int, List[Dict[str, str]]],
+    ) -> Tuple[List[Dict[str, str]], List[int]]:
+        """Replace expanded slides with their expansions and renumber the deck.
+
+        Returns:
+            Tuple of (new slides, original slide number each new slide came from)
+        """
+        new_slides = []
+        sources = []
+        for slide in original_slides:
+            number = slide["slide_number"]
+            if number not in expansions and number == len(new_slides) + 1:
+                # Slides ahead of the first expansion keep their number, so
+                # they are reused as-is instead of copied
+                new_slides.append(slide)
+                sources.append(number)
+                continue
+
+            for new_slide in expansions.get(number, [slide]):
+                new_slides.append({**new_slide, "slide_number": len(new_slides) + 1})
+                sources.append(number)
+        return new_slides, sources
+
+    def _find_original_slide_image(
+        self,
+        original_slides_dir: Path,
+        slide_number: int,
+        original_images: Optional[Set[str]],
+    ) -> Optional[Path]:
+        """Find the original slide image to use for theming an expansion.
+
+        Args:
+            original_slides_dir: The v0/slides directory of the presentation
+            slide_number: Number of the slide in the original presentation
+            original_images: File names in original_slides_dir, or None if it
+                does not exist (see _list_file_names)
+        """
+        # Look for the original slide image in v0/slides directory
+        if original_images is None:
+            self.logger.warning(
+                f"Original slides directory not found: {original_slides_dir}"
+            )
+            return None
 
-            markdown_parts.append("")  # Empty line between slides
+        original_slide_image_path = (
+            original_slides_dir / f"slide_{slide_number:02d}.png"
+        )
+        if original_slide_image_path.name not in original_images:
+            self.logger.warning(
+                f"Original slide image not found: {original_slide_image_path}"
+            )
+            return None
 
-        return "\n".join(markdown_parts)
+        self.logger.info(
+            f"Found original slide image for theming: {original_slide_image_path}"
+        )
+        return original_slide_image_path
 
     def expand_slide(
         self,
@@ -294,116 +636,160 @@ IMPORTANT:
         output_dir: Path,
     ) -> Tuple[Path, List[Path]]:
         """Main method to expand a slide and generate new images."""
-        self.logger.info(f"Starting slide expansion for slide {slide_number}")
-
-        # Read the original presentation
-        with open(presentation_path, "r", encoding="utf-8") as f:
-            original_presentation = f.read()
-
-        # Read the transcript
-        with open(transcript_path, "r", encoding="utf-8") as f:
-            transcript_content = f.read()
-
-        # Find the target slide
-        target_slide = self.find_slide_in_skeleton(original_presentation, slide_number)
-        if not target_slide:
-            raise ValueError(f"Slide {slide_number} not found in presentation")
-
-        # Expand the slide
-        expanded_slides = self.expand_slide_content(target_slide, transcript_content)
-
-        # Create new presentation with expanded slides
-        new_presentation = self.create_expanded_presentation(
-            original_presentation, slide_number, expanded_slides
+        return self.expand_slides(
+            presentation_path, transcript_path, [slide_number], output_dir
         )
 
-        # Save the new presentation
-        new_presentation_path = output_dir / f"{presentation_path.stem}_expanded.md"
-        with open(new_presentation_path, "w", encoding="utf-8") as f:
-            f.write(new_presentation)
+    def expand_slides(
+        self,
+        presentation_path: Path,
+        transcript_path: Path,
+        slide_numbers: List[int],
+        output_dir: Path,
+        max_concurrency: int = 3,
+    ) -> Tuple[Path, List[Path]]:
+        """Expand several slides with one Gemini request and generate new images.
+
+        Each listed slide is replaced by 3 slides; every other slide keeps its
+        original image under its new number. Images for the new slides are
+        generated concurrently, at most max_concurrency at a time; for slides
+        expanded with a streamed request, each image starts as soon as its
+        slide has streamed in.
+        """
+        slide_numbers = sorted(set(slide_numbers))
+        self.logger.info(
+            f"Starting slide expansion for slide {', '.join(map(str, slide_numbers))}"
+        )
 
-        self.logger.info(f"Expanded presentation saved to: {new_presentation_path}")
+        # Read the original presentation and the transcript
+        original_presentation = presentation_path.read_text(encoding="utf-8")
+        transcript_content = transcript_path.read_text(encoding="utf-8")
 
-        # Find the original slide image for theming
-        original_slide_image_path = None
-        try:
-            # Look for the original slide image in v0/slides directory
-            v0_slides_dir = presentation_path.parent / "slides"
-            if v0_slides_dir.exists():
-                original_image_filename = f"slide_{slide_number:02d}.png"
-                original_slide_image_path = v0_slides_dir / original_image_filename
-                if not original_slide_image_path.exists():
-                    self.logger.warning(
-                        f"Original slide image not found: {original_slide_image_path}"
-                    )
-                    original_slide_image_path = None
-                else:
-                    self.logger.info(
-                        f"Found original slide image for theming: {original_slide_image_path}"
-                    )
-            else:
-                self.logger.warning(
-                    f"Original slides directory not found: {v0_slides_dir}"
-                )
-        except Exception as e:
-            self.logger.warning(f"Error finding original slide image: {e}")
+        # Find the target slides
+        original_slides = self.slide_generator.parse_presentation_skeleton(
+            original_presentation
+        )
+        slides_by_number = {slide["slide_number"]: slide for slide in original_slides}
+        for slide_number in slide_numbers:
+            if slide_number not in slides_by_number:
+                raise ValueError(f"Slide {slide_number} not found in presentation")
+        target_slides = [slides_by_number[number] for number in slide_numbers]
 
-        # Handle images for the expanded presentation
-        all_slide_images = []
         slides_dir = output_dir / "slides"
         slides_dir.mkdir(parents=True, exist_ok=True)
 
-        # Parse the new presentation to get all slides with correct numbering
-        with open(new_presentation_path, "r", encoding="utf-8") as f:
-            new_presentation_content = f.read()
+        # Find the original slides directory and the images to theme expansions on
+        original_slides_dir = presentation_path.parent / "slides"
+        # List the directory once instead of checking each image with exists()
+        original_images = _list_file_names(original_slides_dir)
+        theming_images = {
+            number: self._find_original_slide_image(
+                original_slides_dir, number, original_images
+            )
+            for number in slide_numbers
+        }
 
-        all_slides = self.slide_generator.parse_presentation_skeleton(
-            new_presentation_content
-        )
+        with ThreadPoolExecutor(
+            max_workers=max(1, max_concurrency), thread_name_prefix="slide-image"
+        ) as executor:
+            # Images of streamed expansions are started while Gemini is still
+            # writing the later slides, keyed by their number in the new deck
+            early_generations = {}
+
+            def generate_early(
+                original_slide: Dict[str, str], index: int, new_slide: Dict[str, str]
+            ) -> None:
+                original_slide_num = original_slide["slide_number"]
+                # Every expanded slide before this one adds 2 slides
+                expanded_before = sum(
+                    1 for number in slide_numbers if number < original_slide_num
+                )
+                slide = {
+                    **new_slide,
+                    "slide_number": original_slide_num + 2 * expanded_before + index,
+                }
+                self.logger.info(
+                    f"Queueing image for expanded slide {slide['slide_number']}: {slide['title']}"
+                )
+                early_generations[slide["slide_number"]] = (
+                    slide,
+                    executor.submit(
+                        self.slide_generator.generate_slide_image,
+                        slide,
+                        slides_dir,
+                        theming_images[original_slide_num],
+                    ),
+                )
 
-        self.logger.info(
-            f"Processing images for {len(all_slides)} slides in expanded presentation"
-        )
+            # Expand the slides
+            expansions = dict(
+                zip(
+                    slide_numbers,
+                    self.expand_slides_content(
+                        target_slides,
+                        transcript_content,
+                        max_concurrency,
+                        on_slide=generate_early,
+                    ),
+                )
+            )
 
-        # Find the original slides directory
-        original_slides_dir = presentation_path.parent / "slides"
+            # Create new presentation with expanded slides
+            all_slides, sources = self._splice_expansions(original_slides, expansions)
+            new_presentation = self._slides_to_markdown(all_slides)
+
+            # Save the new presentation
+            new_presentation_path = output_dir / f"{presentation_path.stem}_expanded.md"
+            new_presentation_path.write_text(new_presentation, encoding="utf-8")
 
-        for slide in all_slides:
-            slide_num = slide["slide_number"]
+            self.logger.info(f"Expanded presentation saved to: {new_presentation_path}")
 
-            # Determine if this is one of the expanded slides (need generation) or a remaining slide (copy)
-            is_expanded_slide = (
-                slide_num >= slide_number
-                and slide_num < slide_number + len(expanded_slides)
+            # Handle images for the expanded presentation
+            self.logger.info(
+                f"Processing images for {len(all_slides)} slides in expanded presentation"
             )
 
-            if is_expanded_slide:
-                # Generate new image for expanded slide with theming
-                image_path = self.slide_generator.generate_slide_image(
-                    slide, slides_dir, original_slide_image_path
+            # Generate images for the expanded slides with theming, reusing the
+            # ones started while streaming
+            generations = {}
+            for slide, original_slide_num in zip(all_slides, sources):
+                if original_slide_num not in expansions:
+                    continue
+
+                slide_num = slide["slide_number"]
+                if slide_num in early_generations:
+                    early_slide, generation = early_generations[slide_num]
+                    if early_slide == slide:
+                        generations[slide_num] = generation
+                        continue
+                    # The expansion changed after streaming (e.g. the stream
+                    # failed); let the stale image finish before replacing it
+                    generation.result()
+
+                generations[slide_num] = executor.submit(
+                    self.slide_generator.generate_slide_image,
+                    slide,
+                    slides_dir,
+                    theming_images[original_slide_num],
                 )
-                if image_path:
-                    all_slide_images.append(image_path)
-                    self.logger.info(
-                        f"Generated image for expanded slide {slide_num}: {image_path}"
-                    )
-            else:
-                # Copy existing image and rename to match new numbering
-                if slide_num < slide_number:
-                    # Slides before the expanded section: copy as-is
-                    original_image_name = f"slide_{slide_num:02d}.png"
-                else:
-                    # Slides after the expanded section: copy from original numbering (subtract 2)
-                    original_slide_num = slide_num - 2
-                    original_image_name = f"slide_{original_slide_num:02d}.png"
 
+            # Copy the unchanged slides' images while the new ones generate,
+            # rather than waiting on each generation before the copies after it
+            image_paths = {}
+            for slide, original_slide_num in zip(all_slides, sources):
+                slide_num = slide["slide_number"]
+                if slide_num in generations:
+                    continue
+
+                # Copy existing image and rename to match new numbering
+                original_image_name = f"slide_{original_slide_num:02d}.png"
                 original_image_path = original_slides_dir / original_image_name
                 new_image_path = slides_dir / f"slide_{slide_num:02d}.png"
 
-                if original_image_path.exists():
+                if original_images and original_image_name in original_images:
                     # Copy the image
                     shutil.copy2(original_image_path, new_image_path)
-                    all_slide_images.append(new_image_path)
+                    image_paths[slide_num] = new_image_path
                     self.logger.info(
                         f"Copied image for slide {slide_num}: {original_image_name} -> slide_{slide_num:02d}.png"
                     )
@@ -412,6 +798,16 @@ IMPORTANT:
                         f"Original image not found for slide {slide_num}: {original_image_path}"
                     )
 
+            for slide_num, generation in generations.items():
+                image_path = generation.result()
+                if image_path:
+                    image_paths[slide_num] = image_path
+                    self.logger.info(
+                        f"Generated image for expanded slide {slide_num}: {image_path}"
+                    )
+
+        all_slide_images = [image_paths[number] for number in sorted(image_paths)]
+
         self.logger.info(
             f"Slide expansion completed. Processed {len(all_slide_images)} total images"
         )
@@ -421,11 +817,16 @@ IMPORTANT:
 def expand_slide_workflow(
     presentation_path: str,
     transcript_path: str,
-    slide_number: int,
+    slide_number: Union[int, List[int]],
     output_base_dir: str,
     api_key: str,
+    client: Optional[genai.Client] = None,
 ) -> None:
-    """Complete workflow for expanding a slide."""
+    """Complete workflow for expanding a slide.
+
+    Pass a list of slide numbers to expand several slides with one Gemini request,
+    and a client to reuse its connections across workflow runs.
+    """
     # Setup logging
     logger = logging.getLogger(__name__)
 
@@ -434,25 +835,34 @@ def expand_slide_workflow(
     transcript_path = Path(transcript_path)
     output_base_dir = Path(output_base_dir)
 
-    # Find the next available version directory
-    version_num = 1
-    while True:
-        version_dir = output_base_dir / f"v{version_num}"
-        if not version_dir.exists():
-            break
-        version_num += 1
+    # Find the next version directory from one listing of the output folder,
+    # rather than checking v1, v2, ... one at a time
+    try:
+        with os.scandir(output_base_dir) as entries:
+            versions = [
+                int(match.group(1))
+                for entry in entries
+                if (match := VERSION_DIR_PATTERN.fullmatch(entry.name))
+                and entry.is_dir()
+            ]
+    except FileNotFoundError:
+        versions = []
+    version_num = max(versions, default=0) + 1
 
     output_dir = output_base_dir / f"v{version_num}"
     output_dir.mkdir(parents=True, exist_ok=True)
     logger.info(f"Creating new version directory: {output_dir}")
 
     # Initialize expander
-    expander = SlideExpander(api_key=api_key, logger=logger)
+    expander = SlideExpander(api_key=api_key, logger=logger, client=client)
 
     try:
-        # Expand the slide
-        new_presentation_path, new_images = expander.expand_slide(
-            presentation_path, transcript_path, slide_number, output_dir
+        # Expand the slides
+        slide_numbers = (
+            [slide_number] if isinstance(slide_number, int) else list(slide_number)
+        )
+        new_presentation_path, new_images = expander.expand_slides(
+            presentation_path, transcript_path, slide_numbers, output_dir
         )
 
         logger.info(f"Slide expansion completed successfully!")
@@ -0,0 +1,77 @@
+from types import SimpleNamespace
+
+import pytest
+
+from bananadeck.backend import _retry, input2md
+
+
+class FakeModels:
+    """Stand-in for genai.Client.models that replays canned responses in order.
+
+    generate_content returns a string response as ``.text`` and a list of
+    parts as the first candidate's content. generate_content_stream yields a
+    string response in chunk_size pieces, or a list of chunks one by one. An
+    exception, as a response or as a chunk, is raised when it is reached.
+    Instead of a list, responses can be a function called with the request's
+    keyword arguments and whether it is a streaming request.
+    """
+
+    def __init__(self, responses=(), chunk_size=None):
+        self.responses = responses if callable(responses) else list(responses)
+        self.chunk_size = chunk_size
+        self.calls = []
+        self.chunks_sent = 0
+
+    def _next_response(self, kwargs, stream=False):
+        self.calls.append(kwargs)
+        if callable(self.responses):
+            response = self.responses(kwargs, stream)
+        else:
+            response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    def generate_content(self, **kwargs):
+        response = self._next_response(kwargs)
+        if isinstance(response, str):
+            return SimpleNamespace(text=response, candidates=[])
+        content = SimpleNamespace(parts=response)
+        return SimpleNamespace(text=None, candidates=[SimpleNamespace(content=content)])
+
+    def generate_content_stream(self, **kwargs):
+        return self._stream(self._next_response(kwargs, stream=True))
+
+    def _stream(self, response):
+        if isinstance(response, str):
+            size = self.chunk_size or len(response) or 1
+            response = [response[i : i + size] for i in range(0, len(response), size)]
+        for chunk in response:
+            if isinstance(chunk, Exception):
+                raise chunk
+            self.chunks_sent += 1
+            yield SimpleNamespace(text=chunk)
+
+
+@pytest.fixture
+def fake_client():
+    """Build a client whose models replay the given responses; see FakeModels."""
+
+    def make(responses=(), chunk_size=None):
+        return SimpleNamespace(models=FakeModels(responses, chunk_size))
+
+    return make
+
+
+@pytest.fixture(autouse=True)
+def unlimited_rate(monkeypatch):
+    # Tests make many fake calls; never wait on the process-wide budget
+    monkeypatch.setattr(_retry, "_limiter", _retry.RateLimiter(10**6))
+
+
+@pytest.fixture(autouse=True)
+def outputs_dir(tmp_path, monkeypatch):
+    # Keep every output and cache out of the repository's outputs/ folder
+    outputs_dir = tmp_path / "outputs"
+    monkeypatch.setattr(input2md, "OUTPUTS_DIR", outputs_dir)
+    return outputs_dir
@@ -0,0 +1,297 @@
+import json
+import logging
+import threading
+import time
+from io import BytesIO
+
+import pytest
+
+from bananadeck.backend import input2md
+from bananadeck.backend.input2md import (
+    PDFToMarkdown,
+    UniversalConverter,
+    YouTubeToMarkdown,
+)
+
+
+@pytest.fixture
+def pdf_converter(monkeypatch):
+    converter = PDFToMarkdown(
+        api_key="test", logger=logging.getLogger(__name__), client=object()
+    )
+    calls = []
+
+    def process_pdf(pdf_path):
+        calls.append(pdf_path)
+        return f"# Converted {pdf_path.name}"
+
+    monkeypatch.setattr(converter, "process_pdf", process_pdf)
+    converter.calls = calls
+    with converter:
+        yield converter
+        converter.flush()
+
+
+def write_pdf(path, content):
+    path.write_bytes(content)
+    return path
+
+
+def test_pdf_cache_is_keyed_by_content(tmp_path, outputs_dir, pdf_converter):
+    first = write_pdf(tmp_path / "first.pdf", b"%PDF same")
+    renamed = write_pdf(tmp_path / "renamed.pdf", b"%PDF same")
+    edited = write_pdf(tmp_path / "edited.pdf", b"%PDF edited")
+
+    pdf_converter.process_pdf_and_save(first, return_path=True)
+    pdf_converter.flush()
+    markdown = pdf_converter.process_pdf_and_save(renamed)
+    path = pdf_converter.process_pdf_and_save(renamed, return_path=True)
+    pdf_converter.process_pdf_and_save(edited, return_path=True)
+    pdf_converter.flush()
+
+    # The renamed copy is a cache hit, the edited file a miss
+    assert pdf_converter.calls == [first, edited]
+    assert markdown == "# Converted first.pdf"
+    assert path.read_text(encoding="utf-8") == markdown
+    assert len(list((outputs_dir / ".cache").glob("*.md"))) == 2
+
+
+def test_existing_pdf_output_is_not_replaced_from_cache(
+    tmp_path, outputs_dir, pdf_converter
+):
+    pdf_path = write_pdf(tmp_path / "deck.pdf", b"%PDF deck")
+    output_path = tmp_path / "out" / "deck.md"
+    pdf_converter.process_pdf_and_save(pdf_path, output_path=output_path)
+    pdf_converter.flush()
+    output_path.write_text("hand-edited", encoding="utf-8")
+
+    markdown = pdf_converter.process_pdf_and_save(pdf_path, output_path=output_path)
+    path = pdf_converter.process_pdf_and_save(
+        pdf_path, output_path=output_path, return_path=True
+    )
+
+    assert markdown == "hand-edited"
+    assert path == output_path
+    assert path.read_text(encoding="utf-8") == "hand-edited"
+    assert len(pdf_converter.calls) == 1
+
+
+@pytest.mark.parametrize(
+    ("url", "video_id"),
+    [
+        ("https://www.youtube.com/watch?v=dQw4w9WgXcQ", "dQw4w9WgXcQ"),
+        ("https://www.youtube.com/watch?list=PL1&v=dQw4w9WgXcQ&t=42", "dQw4w9WgXcQ"),
+        ("https://youtu.be/dQw4w9WgXcQ?si=abc", "dQw4w9WgXcQ"),
+        ("https://www.youtube.com/shorts/dQw4w9WgXcQ", "dQw4w9WgXcQ"),
+        ("https://www.youtube.com/embed/dQw4w9WgXcQ", "dQw4w9WgXcQ"),
+        ("https://www.youtube.com/live/dQw4w9WgXcQ?feature=share", "dQw4w9WgXcQ"),
+        ("https://www.youtube.com/v/dQw4w9WgXcQ", "dQw4w9WgXcQ"),
+        ("https://m.youtube.com/@channel", "youtube_video"),
+    ],
+)
+def test_youtube_urls_are_detected_by_host(url, video_id):
+    with UniversalConverter(
+        api_key="test", logger=logging.getLogger(__name__), client=object()
+    ) as converter:
+        assert converter.is_youtube_url(url)
+        assert converter.yt_converter.extract_video_id(url) == video_id
+        assert not converter.is_youtube_url("slides/deck.pdf")
+
+
+def test_closing_converter_waits_for_writes_and_stops_io_threads(tmp_path):
+    with UniversalConverter(
+        api_key="test", logger=logging.getLogger(__name__), client=object()
+    ) as converter:
+        saved = converter.pdf_converter.save_markdown("# Deck", tmp_path / "deck.md")
+
+    assert saved.done()
+    assert (tmp_path / "deck.md").read_text(encoding="utf-8") == "# Deck"
+    with pytest.raises(RuntimeError):
+        converter.yt_converter.save_markdown("# Video", tmp_path / "video.md")
+
+
+def write_blank_pdf(path, page_count):
+    pypdf = pytest.importorskip("pypdf")
+    writer = pypdf.PdfWriter()
+    for page in range(page_count):
+        # Each page's width encodes its 1-based page number
+        writer.add_blank_page(width=100 + page + 1, height=100)
+    with open(path, "wb") as f:
+        writer.write(f)
+    return path
+
+
+def page_numbers(pdf_file):
+    from pypdf import PdfReader
+
+    return [int(page.mediabox.width) - 100 for page in PdfReader(pdf_file).pages]
+
+
+def test_split_pdf_returns_ordered_page_ranges(tmp_path):
+    pdf_path = write_blank_pdf(tmp_path / "deck.pdf", 5)
+
+    chunks = input2md._split_pdf(pdf_path, 2)
+
+    assert [(first, last) for first, last, _ in chunks] == [(1, 2), (3, 4), (5, 5)]
+    assert [page_numbers(BytesIO(data)) for _, _, data in chunks] == [
+        [1, 2],
+        [3, 4],
+        [5],
+    ]
+    assert input2md._split_pdf(pdf_path, 5) == []
+
+
+def test_chunked_pdf_is_merged_in_page_order(tmp_path, monkeypatch):
+    pdf_path = write_blank_pdf(tmp_path / "deck.pdf", 7)
+    monkeypatch.setattr(input2md, "PDF_CHUNK_PAGES", 2)
+    converter = PDFToMarkdown(
+        api_key="test", logger=logging.getLogger(__name__), client=object()
+    )
+
+    def convert_chunk(pdf_file, prompt):
+        pages = page_numbers(pdf_file)
+        # Later chunks finish first, so the merge cannot rely on completion order
+        time.sleep(0.05 / pages[0])
+        return " ".join(f"page{page}" for page in pages)
+
+    monkeypatch.setattr(converter, "_convert_pdf_file", convert_chunk)
+    with converter:
+        markdown = converter.process_pdf(pdf_path)
+
+    assert markdown == "page1 page2\n\npage3 page4\n\npage5 page6\n\npage7"
+
+
+def test_missing_pypdf_is_logged_once(tmp_path, monkeypatch, caplog):
+    monkeypatch.setattr(input2md, "PdfReader", None)
+    monkeypatch.setattr(input2md, "_pypdf_fallback_logged", threading.Event())
+    pdf_path = write_pdf(tmp_path / "deck.pdf", b"%PDF deck")
+    converter = PDFToMarkdown(
+        api_key="test", logger=logging.getLogger(__name__), client=object()
+    )
+    monkeypatch.setattr(
+        converter, "_convert_pdf_file", lambda pdf_file, prompt: "# Deck"
+    )
+
+    with converter, caplog.at_level(logging.WARNING):
+        assert converter.process_pdf(pdf_path) == "# Deck"
+        converter.process_pdf(pdf_path)
+
+    assert caplog.text.count("pypdf is not installed") == 1
+
+
+def test_caches_and_last_output_follow_the_outputs_dir(outputs_dir, tmp_path):
+    from bananadeck.backend.skeleton2slides import PresentationSlideGenerator
+    from bananadeck.backend.slides_redo import SlideExpander
+
+    logger = logging.getLogger(__name__)
+    expander = SlideExpander(api_key="test", logger=logger, client=object())
+    generator = PresentationSlideGenerator(
+        logger=logger, api_key="test", client=object()
+    )
+    input2md.record_last_output_dir(tmp_path)
+
+    assert expander.cache_dir == outputs_dir / ".cache" / "expansions"
+    assert generator.cache_dir == outputs_dir / ".cache" / "slide_images"
+    assert (outputs_dir / input2md.LAST_OUTPUT_FILE_NAME).exists()
+
+
+VIDEO_ID = "dQw4w9WgXcQ"
+VIDEO_URL = f"https://www.youtube.com/watch?v={VIDEO_ID}"
+
+
+@pytest.fixture
+def yt_converter(monkeypatch):
+    converter = YouTubeToMarkdown(
+        api_key="test", logger=logging.getLogger(__name__), client=object()
+    )
+    calls = []
+
+    def process_youtube_video(youtube_url):
+        calls.append(youtube_url)
+        return "# Fresh transcript", "My Talk"
+
+    monkeypatch.setattr(converter, "process_youtube_video", process_youtube_video)
+    converter.calls = calls
+    with converter:
+        yield converter
+
+
+def read_video_index(outputs_dir):
+    index_path = outputs_dir / input2md.YOUTUBE_INDEX_FILENAME
+    return json.loads(index_path.read_text(encoding="utf-8"))
+
+
+def write_video_index(outputs_dir, markdown_path):
+    outputs_dir.mkdir(parents=True, exist_ok=True)
+    (outputs_dir / input2md.YOUTUBE_INDEX_FILENAME).write_text(
+        json.dumps(
+            {VIDEO_ID: {"folder": str(markdown_path.parent), "md": str(markdown_path)}}
+        ),
+        encoding="utf-8",
+    )
+
+
+def test_video_index_is_written_by_the_time_flush_returns(outputs_dir, yt_converter):
+    markdown = yt_converter.process_youtube_and_save(VIDEO_URL)
+    yt_converter.flush()
+
+    record = read_video_index(outputs_dir)[VIDEO_ID]
+    assert markdown == "# Fresh transcript"
+    assert record["md"] == str(outputs_dir / f"{VIDEO_ID}_My_Talk" / "My_Talk.md")
+
+
+def test_video_index_hit_skips_the_folder_scan(outputs_dir, yt_converter):
+    # The folder name does not contain the video ID, so only the index finds it
+    markdown_path = outputs_dir / "renamed_talk" / "talk.md"
+    markdown_path.parent.mkdir(parents=True)
+    markdown_path.write_text("# Indexed", encoding="utf-8")
+    write_video_index(outputs_dir, markdown_path)
+
+    assert yt_converter.process_youtube_and_save(VIDEO_URL) == "# Indexed"
+    assert yt_converter.calls == []
+
+
+def test_video_index_miss_falls_back_to_scanning_folders(outputs_dir, yt_converter):
+    markdown_path = outputs_dir / f"{VIDEO_ID}_Old_Talk" / "Old_Talk.md"
+    markdown_path.parent.mkdir(parents=True)
+    markdown_path.write_text("# Scanned", encoding="utf-8")
+
+    assert yt_converter.process_youtube_and_save(VIDEO_URL) == "# Scanned"
+    assert yt_converter.calls == []
+    # The scan result is indexed so the next lookup is a hit
+    assert read_video_index(outputs_dir)[VIDEO_ID]["md"] == str(markdown_path)
+
+
+def test_stale_video_index_entry_is_replaced(outputs_dir, yt_converter):
+    write_video_index(outputs_dir, outputs_dir / "deleted_talk" / "talk.md")
+
+    path = yt_converter.process_youtube_and_save(VIDEO_URL, return_path=True)
+    yt_converter.flush()
+
+    assert yt_converter.calls == [VIDEO_URL]
+    assert path.read_text(encoding="utf-8") == "# Fresh transcript"
+    assert read_video_index(outputs_dir)[VIDEO_ID]["md"] == str(path)
+
+
+def test_last_output_dir_round_trips(tmp_path):
+    input2md.record_last_output_dir(tmp_path)
+
+    assert input2md.read_last_output_dir() == tmp_path
+
+
+@pytest.mark.parametrize("contents", [None, "not json", '{"other": 1}'])
+def test_unreadable_last_output_record_is_ignored(outputs_dir, contents):
+    if contents is not None:
+        outputs_dir.mkdir()
+        (outputs_dir / input2md.LAST_OUTPUT_FILE_NAME).write_text(contents)
+
+    assert input2md.read_last_output_dir() is None
+
+
+def test_last_output_dir_is_ignored_once_deleted(tmp_path):
+    output_dir = tmp_path / "deck"
+    output_dir.mkdir()
+    input2md.record_last_output_dir(output_dir)
+    output_dir.rmdir()
+
+    assert input2md.read_last_output_dir() is None
@@ -0,0 +1,151 @@
+import os
+import re
+
+import pytest
+from google import genai
+from google.genai import types
+
+from bananadeck.backend import input2md, main, slides_redo
+from bananadeck.backend.input2md import PDFToMarkdown
+from bananadeck.backend.md2skeleton import PresentationOutline, SlideOutline
+from bananadeck.backend.skeleton2slides import BATCH_IMAGE_LABEL, IMAGE_MODEL
+
+OUTLINE = PresentationOutline(
+    title="Deck",
+    slides=[
+        SlideOutline(title="Alpha", bullet_points=["First"]),
+        SlideOutline(title="Beta", bullet_points=["Second"]),
+        SlideOutline(title="Gamma", bullet_points=["Third"]),
+    ],
+)
+
+IMAGE_TITLE_PATTERN = re.compile(r"The slide title is: '(.+?)'")
+
+
+def image_response(prompt):
+    """Return one image per slide in prompt, holding that slide's title."""
+    titles = IMAGE_TITLE_PATTERN.findall(prompt)
+    if len(titles) == 1:
+        return [types.Part.from_bytes(data=titles[0].encode(), mime_type="image/png")]
+
+    parts = []
+    for position, title in enumerate(titles, 1):
+        parts.append(types.Part(text=BATCH_IMAGE_LABEL.format(position=position)))
+        parts.append(types.Part.from_bytes(data=title.encode(), mime_type="image/png"))
+    return parts
+
+
+@pytest.fixture
+def run_pipeline(tmp_path, monkeypatch, fake_client, outputs_dir):
+    """Run process_input on a PDF with every Gemini call answered by a fake."""
+
+    def run(skeleton_stream=None):
+        def respond(kwargs, stream):
+            if kwargs["model"] == IMAGE_MODEL:
+                return image_response(kwargs["contents"][0])
+            if stream and skeleton_stream is not None:
+                return skeleton_stream
+            return OUTLINE.model_dump_json()
+
+        client = fake_client(respond, chunk_size=16)
+        monkeypatch.setattr(genai, "Client", lambda api_key: client)
+        monkeypatch.setattr(main, "GEMINI_KEY", "test")
+        monkeypatch.setattr(
+            PDFToMarkdown, "process_pdf", lambda self, pdf_path: "# Notes"
+        )
+
+        pdf_path = tmp_path / "deck.pdf"
+        pdf_path.write_bytes(b"%PDF deck")
+        main.process_input(str(pdf_path))
+        return client.models, outputs_dir / "deck" / "v0" / "slides"
+
+    return run
+
+
+def slide_images(slides_dir):
+    return {path.name: path.read_bytes() for path in sorted(slides_dir.glob("*.png"))}
+
+
+def test_successful_run_records_its_output_folder(run_pipeline, outputs_dir):
+    _, slides_dir = run_pipeline()
+
+    assert len(slide_images(slides_dir)) == 3
+    assert input2md.read_last_output_dir() == outputs_dir / "deck"
+
+
+def make_output_folder(outputs_dir, name, mtime):
+    folder = outputs_dir / name
+    (folder / "v0").mkdir(parents=True)
+    (folder / "transcript.md").write_text("# Notes", encoding="utf-8")
+    (folder / "v0" / f"{name}_presentation.md").write_text("# Deck", encoding="utf-8")
+    os.utime(folder, (mtime, mtime))
+    return folder
+
+
+@pytest.fixture
+def expanded_folders(monkeypatch, outputs_dir):
+    folders = []
+
+    def expand_slide_workflow(**kwargs):
+        folders.append(kwargs["output_base_dir"])
+
+    monkeypatch.setattr(slides_redo, "expand_slide_workflow", expand_slide_workflow)
+    # Hidden folders such as the caches are never picked
+    (outputs_dir / ".cache").mkdir(parents=True)
+    make_output_folder(outputs_dir, "older", 1_000)
+    make_output_folder(outputs_dir, "newer", 2_000)
+    os.utime(outputs_dir / ".cache", (3_000, 3_000))
+    return folders
+
+
+def test_expand_slide_uses_the_recorded_output_folder(outputs_dir, expanded_folders):
+    input2md.record_last_output_dir(outputs_dir / "older")
+
+    main.expand_slide("", slide_number=2)
+
+    assert expanded_folders == [str(outputs_dir / "older")]
+
+
+@pytest.mark.parametrize("recorded", [None, "deleted"])
+def test_expand_slide_falls_back_to_the_newest_folder(
+    outputs_dir, expanded_folders, recorded
+):
+    if recorded is not None:
+        input2md.record_last_output_dir(outputs_dir / recorded)
+
+    main.expand_slide("", slide_number=2)
+
+    assert expanded_folders == [str(outputs_dir / "newer")]
+
+
+def test_streamed_run_numbers_images_by_slide(run_pipeline):
+    models, slides_dir = run_pipeline()
+
+    assert slide_images(slides_dir) == {
+        "slide_01.png": b"Alpha",
+        "slide_02.png": b"Beta",
+        "slide_03.png": b"Gamma",
+    }
+    # One skeleton stream and one image request per slide
+    assert len(models.calls) == 4
+
+
+def test_failed_skeleton_stream_falls_back_without_duplicate_images(
+    run_pipeline, outputs_dir
+):
+    response = OUTLINE.model_dump_json()
+    # The stream breaks after the second slide, once the first was queued
+    cut = response.index('{"title":"Gamma"')
+    models, slides_dir = run_pipeline(
+        skeleton_stream=[response[:cut], RuntimeError("stream reset")]
+    )
+
+    assert slide_images(slides_dir) == {
+        "slide_01.png": b"Alpha",
+        "slide_02.png": b"Beta",
+        "slide_03.png": b"Gamma",
+    }
+    image_calls = [call for call in models.calls if call["model"] == IMAGE_MODEL]
+    # The streamed slide is reused from the cache; the rest go in one batch
+    assert len(image_calls) == 2
+    assert input2md.read_last_output_dir() == outputs_dir / "deck"
@@ -0,0 +1,109 @@
+import json
+import logging
+
+from bananadeck.backend.md2skeleton import (
+    MarkdownToPresentationSkeleton,
+    PresentationOutline,
+    SlideOutline,
+    _OutlineStreamDecoder,
+    render_presentation_markdown,
+)
+from bananadeck.backend.skeleton2slides import _parse_presentation_skeleton
+
+OUTLINE = PresentationOutline(
+    title='Solar {power} "today"',
+    slides=[
+        SlideOutline(title="Intro", bullet_points=["Why, now?", "Costs ] fell"]),
+        SlideOutline(
+            title="Panels",
+            bullet_points=["Photovoltaic cells"],
+            visual_suggestion="Diagram of a {cell}",
+        ),
+        SlideOutline(title="Wrap-up", bullet_points=[]),
+    ],
+)
+
+
+def split_every(text, size):
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+def test_stream_decoder_returns_each_slide_once_complete():
+    response = OUTLINE.model_dump_json(indent=2)
+    for size in (1, 3, 7, len(response)):
+        decoder = _OutlineStreamDecoder()
+        values = []
+        for chunk in split_every(response, size):
+            values.extend(decoder.feed(chunk))
+
+        assert values == [("title", OUTLINE.title)] + [
+            ("slide", slide) for slide in OUTLINE.slides
+        ]
+
+
+def test_stream_decoder_waits_for_the_closing_brace():
+    decoder = _OutlineStreamDecoder()
+
+    assert decoder.feed('{"title": "T", "slides": [{"title": "A", ') == [("title", "T")]
+    assert decoder.feed('"bullet_points": ["x"]}') == [
+        ("slide", SlideOutline(title="A", bullet_points=["x"]))
+    ]
+
+
+def test_stream_and_save_presentation_writes_markdown_and_outline(
+    tmp_path, fake_client
+):
+    client = fake_client([OUTLINE.model_dump_json()], chunk_size=5)
+    generator = MarkdownToPresentationSkeleton(
+        api_key="test", logger=logging.getLogger(__name__), client=client
+    )
+    output_path = tmp_path / "deck_presentation.md"
+
+    streamed = "".join(generator.stream_and_save_presentation("# Notes", output_path))
+
+    expected = render_presentation_markdown(OUTLINE)
+    assert streamed == expected
+    assert output_path.read_text(encoding="utf-8") == expected
+    assert (
+        PresentationOutline.model_validate_json(
+            output_path.with_suffix(".json").read_text(encoding="utf-8")
+        )
+        == OUTLINE
+    )
+    # The stream asks for the same structured output as the batch path
+    config = client.models.calls[0]["config"]
+    assert config.response_mime_type == "application/json"
+
+
+def test_rendered_markdown_parses_back_to_the_outline():
+    slides = _parse_presentation_skeleton(render_presentation_markdown(OUTLINE))
+
+    assert [slide["title"] for slide in slides] == [s.title for s in OUTLINE.slides]
+    assert slides[1]["visual_suggestion"] == "Diagram of a {cell}"
+    assert slides[0]["bullet_points"] == ["Why, now?", "Costs ] fell"]
+
+
+def test_short_batch_only_re_requests_the_missing_document(tmp_path, fake_client):
+    outlines = [
+        PresentationOutline(
+            title=f"Deck {n}", slides=[SlideOutline(title=f"S{n}", bullet_points=[])]
+        )
+        for n in (1, 2, 3)
+    ]
+    # Document 2 is missing from the batched response
+    batch = json.dumps(
+        [dict(outlines[n - 1].model_dump(), doc_number=n) for n in (3, 1)]
+    )
+    client = fake_client([batch, outlines[1].model_dump_json()])
+    generator = MarkdownToPresentationSkeleton(
+        api_key="test", logger=logging.getLogger(__name__), client=client
+    )
+    jobs = [(f"# Notes {n}", tmp_path / f"deck{n}_presentation.md") for n in (1, 2, 3)]
+
+    presentations = generator.generate_and_save_presentations(jobs, batch_size=3)
+
+    assert presentations == [render_presentation_markdown(o) for o in outlines]
+    assert [path.read_text(encoding="utf-8") for _, path in jobs] == presentations
+    retry_contents = client.models.calls[1]["contents"]
+    assert len(client.models.calls) == 2
+    assert [part.text for part in retry_contents][1:] == ["# Notes 2"]
@@ -0,0 +1,125 @@
+from types import SimpleNamespace
+
+import pytest
+from google.genai import errors
+
+from bananadeck.backend import _retry
+from bananadeck.backend._retry import RateLimiter, retry
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+    monkeypatch.setattr(_retry.time, "sleep", delays.append)
+    # Full jitter picks the top of its range, so delays are predictable
+    monkeypatch.setattr(_retry.random, "uniform", lambda low, high: high)
+    return delays
+
+
+def api_error(code, headers=None):
+    error = errors.APIError(code, {})
+    if headers is not None:
+        error.response = SimpleNamespace(headers=headers)
+    return error
+
+
+def failing(*codes, result="ok"):
+    """Return a function raising an APIError for each code, then returning result."""
+    pending = list(codes)
+    calls = []
+
+    def fn():
+        calls.append(None)
+        if pending:
+            raise api_error(pending.pop(0))
+        return result
+
+    fn.calls = calls
+    return fn
+
+
+@pytest.mark.parametrize("code", [429, 500, 502, 503, 504])
+def test_retryable_errors_are_retried_with_backoff(sleeps, code):
+    fn = failing(code, code)
+
+    assert retry(base=2.0)(fn)() == "ok"
+    assert len(fn.calls) == 3
+    assert sleeps == [2.0, 4.0]
+
+
+@pytest.mark.parametrize("code", [400, 401, 403, 404])
+def test_client_errors_are_raised_immediately(sleeps, code):
+    fn = failing(code)
+
+    with pytest.raises(errors.APIError) as excinfo:
+        retry()(fn)()
+
+    assert excinfo.value.code == code
+    assert len(fn.calls) == 1
+    assert sleeps == []
+
+
+def test_last_error_is_raised_after_max_attempts(sleeps):
+    fn = failing(*[503] * 10)
+
+    with pytest.raises(errors.APIError):
+        retry(max_attempts=3)(fn)()
+
+    assert len(fn.calls) == 3
+    assert len(sleeps) == 2
+
+
+def test_backoff_is_capped_at_max_delay(sleeps):
+    fn = failing(*[500] * 4)
+
+    retry(max_attempts=5, base=10.0, max_delay=30.0)(fn)()
+
+    assert sleeps == [10.0, 30.0, 30.0, 30.0]
+
+
+def test_retry_after_header_overrides_backoff(sleeps):
+    errors_raised = [
+        api_error(429, {"retry-after": "7"}),
+        api_error(429, {"retry-after": "600"}),
+        api_error(429, {"retry-after": "soon"}),
+    ]
+
+    def fn():
+        if errors_raised:
+            raise errors_raised.pop(0)
+        return "ok"
+
+    assert retry(base=2.0, max_delay=60.0)(fn)() == "ok"
+    # The header wins, is capped at max_delay, and is ignored if unparsable
+    assert sleeps == [7.0, 60.0, 8.0]
+
+
+def test_rate_limiter_waits_for_a_token_once_the_bucket_is_empty(monkeypatch):
+    now = [100.0]
+    delays = []
+
+    def sleep(delay):
+        delays.append(delay)
+        now[0] += delay
+
+    monkeypatch.setattr(_retry.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(_retry.time, "sleep", sleep)
+    limiter = RateLimiter(rate=2, period=10.0)
+
+    for _ in range(3):
+        limiter.acquire()
+
+    # Two calls fit in the bucket; the third waits for one token to refill
+    assert delays == [pytest.approx(5.0)]
+    assert limiter.window_calls == 3
+
+
+def test_rate_limiter_reads_gemini_rpm(monkeypatch):
+    monkeypatch.setattr(_retry, "_limiter", None)
+    monkeypatch.setenv("GEMINI_RPM", "12")
+
+    limiter = _retry.get_rate_limiter()
+
+    assert limiter.capacity == 12
+    assert limiter.fill_rate == pytest.approx(12 / 60)
+    assert _retry.get_rate_limiter() is limiter
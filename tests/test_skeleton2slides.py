@@ -0,0 +1,153 @@
+import logging
+import time
+
+import pytest
+from google.genai import types
+
+from bananadeck.backend.skeleton2slides import PresentationSlideGenerator
+
+
+def text(value):
+    return types.Part(text=value)
+
+
+def image(data):
+    return types.Part(inline_data=types.Blob(mime_type="image/png", data=data))
+
+
+def make_slide(slide_number):
+    return {
+        "slide_number": slide_number,
+        "title": f"Slide {slide_number}",
+        "bullet_points": [f"Point {slide_number}"],
+        "visual_suggestion": None,
+    }
+
+
+@pytest.fixture
+def make_generator(tmp_path, fake_client):
+    def make(responses):
+        client = fake_client(responses)
+        generator = PresentationSlideGenerator(
+            logger=logging.getLogger(__name__),
+            api_key="test",
+            cache_dir=tmp_path / "cache",
+            client=client,
+        )
+        return generator, client.models
+
+    return make
+
+
+def test_labelled_images_are_matched_by_label_not_position():
+    parts = [
+        text("SLIDE IMAGE 2"),
+        image(b"two"),
+        text("Here is the next one.\nSLIDE IMAGE 1"),
+        image(b"one"),
+    ]
+
+    matched = PresentationSlideGenerator._match_labelled_images(parts, 2)
+
+    assert [part.inline_data.data for part in matched] == [b"one", b"two"]
+
+
+@pytest.mark.parametrize(
+    "parts",
+    [
+        # Unlabelled image
+        [image(b"one"), text("SLIDE IMAGE 2"), image(b"two")],
+        # Two images after one label
+        [text("SLIDE IMAGE 1"), image(b"one"), image(b"two")],
+        # Same label twice
+        [text("SLIDE IMAGE 1"), image(b"one"), text("SLIDE IMAGE 1"), image(b"two")],
+        # A missing slide
+        [text("SLIDE IMAGE 1"), image(b"one")],
+    ],
+)
+def test_unmatched_images_are_rejected(parts):
+    assert PresentationSlideGenerator._match_labelled_images(parts, 2) is None
+
+
+def test_batch_caches_each_image_under_its_own_slide(tmp_path, make_generator):
+    output_dir = tmp_path / "slides"
+    output_dir.mkdir()
+    slides = [make_slide(1), make_slide(2)]
+    generator, models = make_generator(
+        [[text("SLIDE IMAGE 2"), image(b"two"), text("SLIDE IMAGE 1"), image(b"one")]]
+    )
+
+    image_paths = generator.generate_slide_images_batch(slides, output_dir)
+
+    assert [path.read_bytes() for path in image_paths] == [b"one", b"two"]
+    for slide, data in zip(slides, [b"one", b"two"]):
+        cache_path = generator._image_cache_path(generator.generate_image_prompt(slide))
+        assert cache_path.read_bytes() == data
+    assert len(models.calls) == 1
+
+
+def test_batch_with_unlabelled_images_falls_back_per_slide(tmp_path, make_generator):
+    output_dir = tmp_path / "slides"
+    output_dir.mkdir()
+    slides = [make_slide(1), make_slide(2)]
+    generator, models = make_generator(
+        [[image(b"first"), image(b"second")], [image(b"one")], [image(b"two")]]
+    )
+
+    image_paths = generator.generate_slide_images_batch(slides, output_dir)
+
+    assert [path.read_bytes() for path in image_paths] == [b"one", b"two"]
+    assert len(models.calls) == 3
+
+
+def test_slide_image_cache_is_keyed_by_slide_content(tmp_path, make_generator):
+    output_dir = tmp_path / "slides"
+    output_dir.mkdir()
+    slide = make_slide(1)
+    generator, models = make_generator([[image(b"first")], [image(b"edited")]])
+
+    generator.generate_slide_image(slide, output_dir)
+    # A renumbered but otherwise unchanged slide reuses the cached image
+    moved = generator.generate_slide_image({**slide, "slide_number": 3}, output_dir)
+    edited = generator.generate_slide_image(
+        {**slide, "slide_number": 4, "bullet_points": ["Reworded"]}, output_dir
+    )
+
+    assert moved.read_bytes() == b"first"
+    assert edited.read_bytes() == b"edited"
+    assert len(models.calls) == 2
+
+
+def test_streamed_slide_images_are_numbered_by_slide_order(tmp_path, fake_client):
+    titles = ["Slide 1", "Slide 2", "Slide 3"]
+
+    def respond(kwargs, stream):
+        title = next(title for title in titles if f"'{title}'" in kwargs["contents"][0])
+        # Earlier slides take longer, so images complete in reverse order
+        time.sleep(0.02 * (len(titles) - titles.index(title)))
+        return [image(title.encode())]
+
+    generator = PresentationSlideGenerator(
+        logger=logging.getLogger(__name__),
+        api_key="test",
+        cache_dir=tmp_path / "cache",
+        client=fake_client(respond),
+    )
+    skeleton = "# Deck\n\n" + "".join(
+        f"## Slide {n}: Slide {n}\n- Point {n}\n\n" for n in (1, 2, 3)
+    )
+    chunks = [skeleton[i : i + 9] for i in range(0, len(skeleton), 9)]
+
+    markdown, image_paths = generator.generate_slide_images_from_stream(
+        chunks, tmp_path / "slides", max_concurrency=3
+    )
+
+    assert markdown == skeleton
+    assert [path.name for path in image_paths] == [
+        "slide_01.png",
+        "slide_02.png",
+        "slide_03.png",
+    ]
+    assert [path.read_bytes() for path in image_paths] == [
+        title.encode() for title in titles
+    ]
@@ -0,0 +1,562 @@
+import logging
+import random
+import re
+
+import pytest
+from google.genai import types
+
+from bananadeck.backend.skeleton2slides import IMAGE_MODEL
+from bananadeck.backend.slides_redo import (
+    WORD_PATTERN,
+    SlideExpander,
+    _index_transcript,
+    expand_slide_workflow,
+)
+
+IMAGE_TITLE_PATTERN = re.compile(r"The slide title is: '(.+?)'")
+
+
+def expansion_markdown(*titles):
+    return "".join(
+        f"## Slide {i}: {title}\n- Detail\n\n" for i, title in enumerate(titles, 1)
+    )
+
+
+@pytest.fixture
+def make_expander(tmp_path, fake_client):
+    def make(responses, chunk_size=7):
+        client = fake_client(responses, chunk_size)
+        expander = SlideExpander(
+            api_key="test",
+            logger=logging.getLogger(__name__),
+            cache_dir=tmp_path,
+            client=client,
+        )
+        return expander, client.models
+
+    return make
+
+
+@pytest.fixture
+def expander(tmp_path):
+    # The client is never used by the methods under test
+    return SlideExpander(
+        api_key="test",
+        logger=logging.getLogger(__name__),
+        cache_dir=tmp_path,
+        client=object(),
+    )
+
+
+def make_slide(title, bullet_points=(), slide_number=1):
+    return {
+        "slide_number": slide_number,
+        "title": title,
+        "bullet_points": list(bullet_points),
+        "visual_suggestion": None,
+    }
+
+
+def reference_transcript_content(slide, transcript_content):
+    """Split-based matcher that find_transcript_content_for_slide must agree with."""
+    search_terms = {
+        word
+        for text in (slide["title"], *slide["bullet_points"])
+        for word in WORD_PATTERN.findall(text.lower())
+    }
+    best_match = None
+    max_matches = 0
+    for section in transcript_content.split("\n\n"):
+        if len(section.strip()) < 50:
+            continue
+        matches = len(search_terms.intersection(WORD_PATTERN.findall(section.lower())))
+        if matches > max_matches:
+            max_matches = matches
+            best_match = section
+    return best_match if best_match is not None else transcript_content[:1000]
+
+
+def test_transcript_section_with_most_slide_words_is_chosen(expander):
+    intro = "Welcome everyone, today we talk about a few unrelated things at length."
+    relevant = (
+        "Solar panels convert sunlight into electricity using photovoltaic cells."
+    )
+    transcript = (
+        f"{intro}\n\n{relevant}\n\nThanks for listening, see you next time around!"
+    )
+    slide = make_slide("Solar panels", ["Photovoltaic cells convert sunlight"])
+
+    assert expander.find_transcript_content_for_slide(slide, transcript) == relevant
+
+
+def test_transcript_length_filter_uses_original_text(expander):
+    # "İ" lowercases to two characters, so this section is 49 characters long
+    # but 50 once lowercased; it must still count as too short
+    section = "İstanbul\nstraße " + "x" * 23 + " omegazeta"
+    assert len(section) == 49
+    assert len(section.lower()) == 50
+    transcript = f"{section}\n\nshort"
+    slide = make_slide("Istanbul omegazeta")
+
+    result = expander.find_transcript_content_for_slide(slide, transcript)
+
+    assert result == transcript[:1000]
+    assert result == reference_transcript_content(slide, transcript)
+
+
+def test_transcript_section_after_non_ascii_text_is_sliced_exactly(expander):
+    first = "İİİİ " * 12 + "filler words only here"
+    second = "The quarterly revenue grew strongly across every single region."
+    transcript = f"{first}\n\n{second}"
+    slide = make_slide("Quarterly revenue", ["Region growth"])
+
+    assert expander.find_transcript_content_for_slide(slide, transcript) == second
+
+
+def test_transcript_matching_agrees_with_split_reference(expander):
+    rng = random.Random(0)
+    words = [
+        "alpha",
+        "beta",
+        "gamma",
+        "delta",
+        "İstanbul",
+        "STRASSE",
+        "straße",
+        "ǅemal",
+    ]
+    pieces = words + [" ", "\n", "\n\n", " " * 10, "İ"]
+    for _ in range(2000):
+        transcript = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 80)))
+        slide = make_slide(" ".join(rng.sample(words, 2)), [rng.choice(words)])
+
+        assert expander.find_transcript_content_for_slide(
+            slide, transcript
+        ) == reference_transcript_content(slide, transcript)
+
+
+def test_index_transcript_offsets_slice_the_original_sections():
+    transcript = "İİ first\n\n\nsecond straße\n\nİstanbul third\n\n"
+
+    sections = _index_transcript(transcript)
+
+    assert [transcript[start:end] for start, end in sections] == transcript.split(
+        "\n\n"
+    )
+
+
+def test_index_transcript_is_reused_for_the_same_transcript(expander):
+    transcript = (
+        "Solar panels convert sunlight into electricity using photovoltaic cells."
+    )
+    _index_transcript.cache_clear()
+
+    expander.find_transcript_content_for_slide(make_slide("Solar panels"), transcript)
+    expander.find_transcript_content_for_slide(make_slide("Sunlight cells"), transcript)
+
+    assert _index_transcript.cache_info().hits == 1
+
+
+def test_direct_split_keeps_bullet_order_and_visual_on_first_part(expander):
+    bullet_points = [f"Point {i}" for i in range(7)]
+    slide = make_slide("Roadmap", bullet_points, slide_number=4)
+    slide["visual_suggestion"] = "Timeline of the milestones"
+
+    parts = expander._split_without_model(slide)
+
+    assert [part["title"] for part in parts] == [
+        "Roadmap (Part 1)",
+        "Roadmap (Part 2)",
+        "Roadmap (Part 3)",
+    ]
+    assert [part["bullet_points"] for part in parts] == [
+        bullet_points[:2],
+        bullet_points[2:4],
+        bullet_points[4:],
+    ]
+    assert [part["visual_suggestion"] for part in parts] == [
+        "Timeline of the milestones",
+        None,
+        None,
+    ]
+
+
+def test_light_slide_is_not_split_directly(expander):
+    assert expander._split_without_model(make_slide("Intro", ["One", "Two"])) is None
+
+
+def test_expansion_cache_is_keyed_by_slide_content(make_expander):
+    expander, models = make_expander(
+        [expansion_markdown("A", "B", "C"), expansion_markdown("D", "E", "F")]
+    )
+    slide = make_slide("Topic", ["Short point"])
+
+    first = expander.expand_slide_content(slide, "")
+    cached = expander.expand_slide_content(slide, "")
+    edited = expander.expand_slide_content(make_slide("Topic", ["Other point"]), "")
+
+    assert (
+        [s["title"] for s in cached] == [s["title"] for s in first] == ["A", "B", "C"]
+    )
+    assert [s["title"] for s in edited] == ["D", "E", "F"]
+    assert len(models.calls) == 2
+
+
+def test_incomplete_expansion_is_padded_but_not_cached(make_expander):
+    expander, models = make_expander(
+        [expansion_markdown("A", "B"), expansion_markdown("A", "B", "C")]
+    )
+    slide = make_slide("Topic", ["Short point"])
+
+    padded = expander.expand_slide_content(slide, "")
+    retried = expander.expand_slide_content(slide, "")
+
+    assert [s["title"] for s in padded] == ["A", "B", "Topic (Part 3)"]
+    assert [s["title"] for s in retried] == ["A", "B", "C"]
+    assert len(models.calls) == 2
+
+
+def test_expansion_stream_stops_after_three_slides(make_expander):
+    response = expansion_markdown("One", "Two", "Three", "Four", "Five")
+    expander, models = make_expander([response])
+    reported = []
+
+    slides = expander.expand_slide_content(
+        make_slide("Topic", ["Short point"]),
+        "",
+        on_slide=lambda slide, index, new_slide: reported.append(new_slide["title"]),
+    )
+
+    assert [slide["title"] for slide in slides] == ["One", "Two", "Three"]
+    assert reported == ["One", "Two", "Three"]
+    assert models.chunks_sent < -(-len(response) // models.chunk_size)
+
+
+def test_failed_expansion_stream_falls_back_to_a_regular_request(make_expander):
+    expander, models = make_expander(
+        [
+            [expansion_markdown("One")[:10], RuntimeError("connection reset")],
+            expansion_markdown("A", "B", "C"),
+        ]
+    )
+
+    slides = expander.expand_slide_content(make_slide("Topic", ["Short point"]), "")
+
+    assert [slide["title"] for slide in slides] == ["A", "B", "C"]
+    assert len(models.calls) == 2
+
+
+def test_splice_expansions_renumbers_the_deck(expander):
+    original = [make_slide(f"Slide {n}", slide_number=n) for n in range(1, 6)]
+    expansions = {
+        2: [make_slide(f"2{part}", slide_number=part) for part in "abc"],
+        4: [make_slide(f"4{part}", slide_number=part) for part in "abc"],
+    }
+
+    new_slides, sources = expander._splice_expansions(original, expansions)
+
+    assert [slide["title"] for slide in new_slides] == [
+        "Slide 1",
+        "2a",
+        "2b",
+        "2c",
+        "Slide 3",
+        "4a",
+        "4b",
+        "4c",
+        "Slide 5",
+    ]
+    assert [slide["slide_number"] for slide in new_slides] == list(range(1, 10))
+    assert sources == [1, 2, 2, 2, 3, 4, 4, 4, 5]
+    # Slides before the first expansion are reused, later ones are copies
+    assert new_slides[0] is original[0]
+    assert original[2]["slide_number"] == 3
+
+
+SKELETON = """# Deck
+
+## Slide 1: Intro
+- Hello
+
+## Slide 2: Details
+- First
+- Second
+- **Visual suggestion:** A chart
+
+## Slide 3: Wrap-up
+- Bye
+"""
+
+
+def test_find_slide_in_skeleton_returns_a_copy_of_the_slide(expander):
+    slide = expander.find_slide_in_skeleton(SKELETON, 2)
+
+    assert slide == {
+        "slide_number": 2,
+        "title": "Details",
+        "bullet_points": ["First", "Second"],
+        "visual_suggestion": "A chart",
+    }
+    slide["bullet_points"].append("Edited")
+    assert expander.find_slide_in_skeleton(SKELETON, 2)["bullet_points"] == [
+        "First",
+        "Second",
+    ]
+    assert expander.find_slide_in_skeleton(SKELETON, 4) is None
+
+
+def test_create_expanded_presentation_splices_and_renumbers(expander):
+    parts = [make_slide(f"Details {n}", [f"Point {n}"]) for n in (1, 2, 3)]
+
+    markdown = expander.create_expanded_presentation(SKELETON, 2, parts)
+
+    slides = expander.slide_generator.parse_presentation_skeleton(markdown)
+    assert [(s["slide_number"], s["title"]) for s in slides] == [
+        (1, "Intro"),
+        (2, "Details 1"),
+        (3, "Details 2"),
+        (4, "Details 3"),
+        (5, "Wrap-up"),
+    ]
+    with pytest.raises(ValueError):
+        expander.create_expanded_presentation(SKELETON, 9, parts)
+
+
+def batch_response(*expansions):
+    return "".join(
+        f"=== EXPANSION {position} ===\n{expansion}"
+        for position, expansion in enumerate(expansions, 1)
+    )
+
+
+@pytest.fixture
+def batch_slides():
+    return [
+        make_slide("Intro", ["Short point"], slide_number=1),
+        make_slide("Outro", ["Other point"], slide_number=2),
+    ]
+
+
+def count_transcript_searches(expander, monkeypatch):
+    searches = []
+    search = expander.find_transcript_content_for_slide
+
+    def counting_search(slide, transcript_content):
+        searches.append(slide["slide_number"])
+        return search(slide, transcript_content)
+
+    monkeypatch.setattr(expander, "find_transcript_content_for_slide", counting_search)
+    return searches
+
+
+def test_batch_expansion_is_split_on_delimiters(
+    make_expander, batch_slides, monkeypatch
+):
+    expander, models = make_expander(
+        [
+            "Sure!\n"
+            + batch_response(
+                expansion_markdown("A", "B", "C"), expansion_markdown("D", "E", "F")
+            )
+        ]
+    )
+    searches = count_transcript_searches(expander, monkeypatch)
+
+    expansions = expander.expand_slides_content(batch_slides, "")
+
+    assert [[s["title"] for s in slides] for slides in expansions] == [
+        ["A", "B", "C"],
+        ["D", "E", "F"],
+    ]
+    assert len(models.calls) == 1
+    assert sorted(searches) == [1, 2]
+
+
+@pytest.mark.parametrize(
+    "batch",
+    [
+        # The second delimiter is missing
+        batch_response(expansion_markdown("A", "B", "C"))
+        + expansion_markdown("D", "E", "F"),
+        # The second delimiter is garbled
+        batch_response(expansion_markdown("A", "B", "C"))
+        + "=== EXPANSION two ===\n"
+        + expansion_markdown("D", "E", "F"),
+        # The request itself fails
+        RuntimeError("quota exceeded"),
+    ],
+)
+def test_failed_batch_expansion_falls_back_per_slide(
+    make_expander, batch_slides, monkeypatch, batch
+):
+    expander, models = make_expander(
+        [batch, expansion_markdown("G", "H", "I"), expansion_markdown("J", "K", "L")]
+    )
+    searches = count_transcript_searches(expander, monkeypatch)
+    reported = []
+
+    expansions = expander.expand_slides_content(
+        batch_slides,
+        "",
+        max_concurrency=1,
+        on_slide=lambda slide, index, new_slide: reported.append(
+            (slide["slide_number"], index)
+        ),
+    )
+
+    assert [[s["title"] for s in slides] for slides in expansions] == [
+        ["G", "H", "I"],
+        ["J", "K", "L"],
+    ]
+    assert len(models.calls) == 3
+    assert sorted(reported) == [(1, 0), (1, 1), (1, 2), (2, 0), (2, 1), (2, 2)]
+    # The prompts built for the batch are reused by the fallback
+    assert sorted(searches) == [1, 2]
+
+
+def test_single_pending_slide_is_expanded_without_a_batch(
+    make_expander, batch_slides, monkeypatch
+):
+    expander, models = make_expander([expansion_markdown("A", "B", "C")])
+    searches = count_transcript_searches(expander, monkeypatch)
+
+    expansions = expander.expand_slides_content(batch_slides[:1], "")
+
+    assert [s["title"] for s in expansions[0]] == ["A", "B", "C"]
+    assert len(models.calls) == 1
+    assert searches == [1]
+
+
+@pytest.fixture
+def expanded_output_dirs(monkeypatch):
+    output_dirs = []
+
+    def expand_slides(
+        self, presentation_path, transcript_path, slide_numbers, output_dir
+    ):
+        output_dirs.append(output_dir)
+        return output_dir / "deck_expanded.md", []
+
+    monkeypatch.setattr(SlideExpander, "expand_slides", expand_slides)
+    return output_dirs
+
+
+def run_workflow(output_base_dir):
+    expand_slide_workflow(
+        presentation_path=str(output_base_dir / "v0" / "deck_presentation.md"),
+        transcript_path=str(output_base_dir / "deck.md"),
+        slide_number=2,
+        output_base_dir=str(output_base_dir),
+        api_key="test",
+        client=object(),
+    )
+
+
+def test_workflow_creates_the_version_after_the_highest_one(
+    tmp_path, expanded_output_dirs
+):
+    for name in ("v0", "v2", "v10x", "notes", "slides"):
+        (tmp_path / name).mkdir()
+    # Only directories named exactly vN count as versions
+    (tmp_path / "v7").write_text("not a folder", encoding="utf-8")
+
+    run_workflow(tmp_path)
+    run_workflow(tmp_path)
+
+    assert expanded_output_dirs == [tmp_path / "v3", tmp_path / "v4"]
+    assert (tmp_path / "v3").is_dir()
+
+
+def test_workflow_starts_at_v1_in_a_new_output_folder(tmp_path, expanded_output_dirs):
+    run_workflow(tmp_path / "deck")
+
+    assert expanded_output_dirs == [tmp_path / "deck" / "v1"]
+
+
+@pytest.fixture
+def original_deck(tmp_path):
+    """A 4-slide v0 presentation whose images hold their original slide number."""
+    v0_dir = tmp_path / "deck" / "v0"
+    (v0_dir / "slides").mkdir(parents=True)
+    presentation_path = v0_dir / "deck_presentation.md"
+    presentation_path.write_text(
+        "# Deck\n\n"
+        + "".join(f"## Slide {n}: Title {n}\n- Point {n}\n\n" for n in range(1, 5)),
+        encoding="utf-8",
+    )
+    for n in range(1, 5):
+        (v0_dir / "slides" / f"slide_{n:02d}.png").write_bytes(f"original {n}".encode())
+    transcript_path = tmp_path / "deck" / "deck.md"
+    transcript_path.write_text("# Notes", encoding="utf-8")
+    return presentation_path, transcript_path
+
+
+def expand_deck(original_deck, fake_client, expansion_stream, expansion=None):
+    def respond(kwargs, stream):
+        if kwargs["model"] == IMAGE_MODEL:
+            prompt = kwargs["contents"][0]
+            return [
+                types.Part.from_bytes(
+                    data=IMAGE_TITLE_PATTERN.search(prompt).group(1).encode(),
+                    mime_type="image/png",
+                )
+            ]
+        return expansion_stream if stream else expansion
+
+    client = fake_client(respond, chunk_size=7)
+    expander = SlideExpander(
+        api_key="test", logger=logging.getLogger(__name__), client=client
+    )
+    presentation_path, transcript_path = original_deck
+    output_dir = presentation_path.parent.parent / "v1"
+    _, image_paths = expander.expand_slide(
+        presentation_path, transcript_path, 2, output_dir
+    )
+
+    image_calls = [call for call in client.models.calls if call["model"] == IMAGE_MODEL]
+    images = {path.name: path.read_bytes() for path in image_paths}
+    return images, len(image_calls)
+
+
+def test_expand_slides_generates_new_images_and_copies_the_rest(
+    original_deck, fake_client
+):
+    images, image_calls = expand_deck(
+        original_deck, fake_client, expansion_markdown("A", "B", "C")
+    )
+
+    assert images == {
+        "slide_01.png": b"original 1",
+        "slide_02.png": b"A",
+        "slide_03.png": b"B",
+        "slide_04.png": b"C",
+        "slide_05.png": b"original 3",
+        "slide_06.png": b"original 4",
+    }
+    # Images started while streaming are reused, not generated again
+    assert image_calls == 3
+
+
+def test_expand_slides_regenerates_images_started_from_a_failed_stream(
+    original_deck, fake_client
+):
+    streamed = expansion_markdown("A", "B")
+    # Slide A is complete, and its image started, before the stream fails
+    cut = streamed.index("## Slide 2") + len("## ")
+    images, image_calls = expand_deck(
+        original_deck,
+        fake_client,
+        [streamed[:cut], RuntimeError("stream reset")],
+        expansion=expansion_markdown("X", "Y", "Z"),
+    )
+
+    assert images == {
+        "slide_01.png": b"original 1",
+        "slide_02.png": b"X",
+        "slide_03.png": b"Y",
+        "slide_04.png": b"Z",
+        "slide_05.png": b"original 3",
+        "slide_06.png": b"original 4",
+    }
+    # The stale image of A is replaced; the other two are generated once
+    assert image_calls == 4